@@ -1,4 +1,4 @@
-from .conditions import Condition
+from .conditions import Condition, decrement, increment, param
 from .engine import Engine
 from .exceptions import (
     BloopException,
@@ -9,7 +9,7 @@ from .exceptions import (
     TableMismatch,
 )
 from .models import BaseModel, Column, GlobalSecondaryIndex, LocalSecondaryIndex
-from .search import QueryIterator, ScanIterator
+from .search import MultiQueryIterator, QueryIterator, QueryTemplate, ScanIterator, SegmentedCount
 from .signals import (
     before_create_table,
     model_bound,
@@ -19,6 +19,7 @@ from .signals import (
     object_loaded,
     object_modified,
     object_saved,
+    objects_loaded,
 )
 from .stream import Stream
 from .types import (
@@ -46,12 +47,13 @@ __all__ = [
 
     # Signals
     "before_create_table", "model_bound", "model_created", "model_validated",
-    "object_deleted", "object_loaded", "object_modified", "object_saved",
+    "object_deleted", "object_loaded", "object_modified", "object_saved", "objects_loaded",
 
     # Types
     "UUID", "Binary", "Boolean", "DateTime", "Integer", "List", "Map", "Number", "Set", "String",
 
     # Misc
-    "Condition", "QueryIterator", "ScanIterator", "Stream"
+    "Condition", "MultiQueryIterator", "QueryIterator", "QueryTemplate", "ScanIterator", "SegmentedCount", "Stream",
+    "decrement", "increment", "param",
 ]
 __version__ = "1.2.0"
@@ -1,7 +1,14 @@
 # http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/ \
 #   Expressions.SpecifyingConditions.html#ConditionExpressionReference.Syntax
+import base64
 import collections
+import copy
+import decimal
+import itertools
 import logging
+import operator
+import threading
+import weakref
 
 from .exceptions import InvalidCondition
 from .signals import (
@@ -10,11 +17,11 @@ from .signals import (
     object_modified,
     object_saved,
 )
-from .types import supports_operation
+from .types import LIST, MAP, NUMBER, SETS, supports_operation
 from .util import WeakDefaultDictionary, missing
 
 
-__all__ = ["Condition", "render"]
+__all__ = ["Condition", "Increment", "Param", "RenderCache", "decrement", "increment", "normalize", "param", "render"]
 
 
 comparison_aliases = {
@@ -34,18 +41,62 @@ logger = logging.getLogger("bloop.conditions")
 
 # Tracks the state of instances of models:
 # 1) Are any columns marked for including in an update?
-# 2) Latest snapshot for atomic operations
-_obj_tracking = WeakDefaultDictionary(lambda: {"marked": set(), "snapshot": None})
+# 2) Latest snapshot for atomic operations, as {column: dumped value}.  Not tracked when Meta.atomic_tracking is False
+# 3) Raw values of lazily loaded columns that haven't been read yet, and the engine to load them with
+# 4) Was the snapshot built during hydration, so the next object_loaded doesn't need to sync?
+# 5) Deferred columns that haven't been loaded, and the DeferredLoad that will load them
+# 6) The AccessProfile of the search that loaded the object, which records each column that's read
+# Compact models (Meta.compact = True) keep 1, 2, and 4 in slots on the instance; see bloop.models.setup_compact
+_obj_tracking = WeakDefaultDictionary(
+    lambda: {"marked": set(), "snapshot": None, "lazy": {}, "engine": None, "hydrated": False,
+             "deferred": set(), "deferred_load": None, "profile": None})
+# Shared, never modified
+_no_lazy_values = {}
+_no_deferred_columns = set()
+
+
+def _get_state(obj, key):
+    if obj.Meta.compact:
+        return getattr(obj, "_bloop_" + key, None)
+    return _obj_tracking[obj][key]
+
+
+def _set_state(obj, key, value):
+    if obj.Meta.compact:
+        setattr(obj, "_bloop_" + key, value)
+    else:
+        _obj_tracking[obj][key] = value
+
+
+def _lazy_values(obj):
+    """Raw values of unread lazy columns.  Doesn't create tracking for objects that were never lazily loaded."""
+    tracking = _obj_tracking.get(obj)
+    return tracking["lazy"] if tracking else _no_lazy_values
+
+
+def mark(obj, columns):
+    """Mark columns of an object for including in the next update"""
+    if obj.Meta.compact:
+        marked = getattr(obj, "_bloop_marked", 0)
+        for column in columns:
+            marked |= column._bit
+        obj._bloop_marked = marked
+    else:
+        _obj_tracking[obj]["marked"].update(columns)
 
 
 @object_deleted.connect
 def on_object_deleted(_, *, obj, **kwargs):
-    _obj_tracking[obj].pop("snapshot", None)
+    _set_state(obj, "snapshot", None)
 
 
 @object_loaded.connect
 def on_object_loaded(_, *, engine, obj, **kwargs):
-    sync(obj, engine)
+    # hydrate already built the snapshot from the wire values
+    if _get_state(obj, "hydrated"):
+        _set_state(obj, "hydrated", False)
+    else:
+        sync(obj, engine)
 
 
 @object_modified.connect
@@ -53,7 +104,11 @@ def on_object_modified(_, *, obj, column, **kwargs):
     # Mark a column for a given object as being modified in any way.
     # Any marked columns will be pushed (possibly as DELETES) in
     # future UpdateItem calls that include the object.
-    _obj_tracking[obj]["marked"].add(column)
+    mark(obj, (column,))
+    # The raw value is stale once the column is set or deleted
+    _lazy_values(obj).pop(column, None)
+    # Don't load over a local change
+    get_deferred(obj).discard(column)
 
 
 @object_saved.connect
@@ -61,44 +116,203 @@ def on_object_saved(_, *, engine, obj, **kwargs):
     sync(obj, engine)
 
 
-def sync(obj, engine):
+def sync(obj, engine, raw=None):
     """Mark the object as having been persisted at least once.
 
-    Store the latest snapshot of all marked values."""
-    snapshot = Condition()
+    Store the latest dumped value of all marked columns.  The snapshot condition is only built when it's rendered.
+
+    :param dict raw: *(Optional)* Column -> dumped value, used instead of dumping the object's value."""
+    if not obj.Meta.atomic_tracking:
+        return
+    snapshot = {}
     # Only expect values (or lack of a value) for columns that have been explicitly set
-    for column in sorted(_obj_tracking[obj]["marked"], key=lambda col: col.dynamo_name):
-        value = getattr(obj, column.model_name, None)
-        value = engine._dump(column.typedef, value)
-        condition = column == value
-        # The renderer shouldn't try to dump the value again.
-        # We're dumping immediately in case the value is mutable,
-        # such as a set or (many) custom data types.
-        condition.dumped = True
-        snapshot &= condition
-    _obj_tracking[obj]["snapshot"] = snapshot
+    lazy = _lazy_values(obj)
+    raw = raw or _no_lazy_values
+    for column in get_marked(obj):
+        # Hydrated and lazy columns have a raw value that's already dumped
+        value = raw.get(column, missing)
+        if value is missing:
+            value = lazy.get(column, missing)
+        if value is missing:
+            # We're dumping immediately in case the value is mutable,
+            # such as a set or (many) custom data types.
+            value = getattr(obj, column.model_name, None)
+            value = engine._dump(column.typedef, value)
+        snapshot[column] = value
+    _set_state(obj, "snapshot", snapshot)
 
 
 def get_snapshot(obj):
-    # Cached value
-    snapshot = _obj_tracking[obj].get("snapshot", None)
-    if snapshot is not None:
-        return snapshot
+    """Build a condition that expects each column's value from the last sync.
+
+    If the object has never been synced, the condition expects every column to be empty.
+
+    :raises bloop.exceptions.InvalidCondition: if the model's ``Meta.atomic_tracking`` is False.
+    """
+    if not obj.Meta.atomic_tracking:
+        raise InvalidCondition("{!r} doesn't track atomic snapshots.  Meta.atomic_tracking is False.".format(
+            obj.__class__.__name__))
+    values = _get_state(obj, "snapshot")
+    if values is None:
+        values = {column: None for column in obj.Meta.columns}
 
-    # If the object has never been synced, create and cache
-    # a condition that expects every column to be empty
     snapshot = Condition()
-    for column in sorted(obj.Meta.columns, key=lambda col: col.dynamo_name):
-        snapshot &= column.is_(None)
-    _obj_tracking[obj]["snapshot"] = snapshot
+    for column in sorted(values, key=lambda col: col.dynamo_name):
+        condition = column == values[column]
+        # The renderer shouldn't try to dump the value again.
+        condition.dumped = True
+        snapshot &= condition
     return snapshot
 
 
+def get_version_condition(obj):
+    """Build a condition that expects the local value of the object's version column.
+
+    If the object doesn't have a version yet, the condition expects the version to be empty.
+    """
+    column = obj.Meta.version_column
+    value = getattr(obj, column.model_name, None)
+    if value is None:
+        return column.is_(None)
+    return column == value
+
+
 def get_marked(obj):
     """Returns the set of marked columns for an object"""
+    if obj.Meta.compact:
+        marked = getattr(obj, "_bloop_marked", 0)
+        return {column for column in obj.Meta.columns if marked & column._bit}
     return set(_obj_tracking[obj]["marked"])
 
 
+def hydrate(obj, attrs, codec, engine):
+    """Load values into an object's storage without sending :data:`~bloop.signals.object_modified` for each column.
+
+    The codec's columns are marked in one step, and the snapshot is built from the wire values in ``attrs``.  The
+    next :data:`~bloop.signals.object_loaded` for the object won't sync it again; that signal only follows when the
+    engine sends it for each object.
+
+    :param dict attrs: Item in DynamoDB's wire format.
+    :param codec: From :func:`Engine._codec <bloop.engine.Engine._codec>` for the columns to load.
+    :param engine: :class:`~bloop.engine.Engine` whose context is used to load each value.
+    """
+    context = engine._context
+    for column, (dynamo_name, _, load) in zip(codec.columns, codec.load):
+        # Skip Column.set and its object_modified signal
+        column._set(obj, load(attrs.get(dynamo_name, None), context=context))
+
+    mark(obj, codec.columns)
+    lazy = _lazy_values(obj)
+    if lazy:
+        for column in codec.columns:
+            lazy.pop(column, None)
+    if obj.Meta.atomic_tracking:
+        sync(obj, engine, raw={column: attrs.get(column.dynamo_name, None) for column in codec.columns})
+    _set_state(obj, "hydrated", engine.object_loaded_signals)
+    return obj
+
+
+def set_lazy(obj, engine, attrs, expected):
+    """Keep the raw values of the expected columns to load the first time each column is read.
+
+    Each expected column is marked, as if it had been set by :func:`~bloop.util.unpack_from_dynamodb`, and the
+    snapshot is built from the raw values."""
+    tracking = _obj_tracking[obj]
+    tracking["engine"] = engine
+    mark(obj, expected)
+    lazy = tracking["lazy"]
+    for column in expected:
+        lazy[column] = attrs.get(column.dynamo_name, None)
+    sync(obj, engine)
+    _set_state(obj, "hydrated", engine.object_loaded_signals)
+
+
+def load_lazy(obj, column):
+    """Load and forget the raw value of a lazy column.  Returns ``missing`` if the column isn't lazy."""
+    value = _lazy_values(obj).pop(column, missing)
+    if value is missing:
+        return missing
+    tracking = _obj_tracking[obj]
+    if tracking["profile"] is not None:
+        tracking["profile"].read.add(column)
+    return tracking["engine"]._load(column.typedef, value)
+
+
+class DeferredLoad:
+    """Objects loaded together whose deferred columns haven't been read.
+
+    The first time any of their deferred columns is read, every object's unread deferred columns are loaded in one
+    call to :func:`Engine._load_deferred <bloop.engine.Engine._load_deferred>`."""
+    def __init__(self, engine, consistent=False):
+        self.engine = engine
+        self.consistent = consistent
+        self.objs = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def add(self, obj, columns):
+        """Defer loading the columns of an object that was just loaded without them.  Columns that already have a
+        local value keep it."""
+        pending = set()
+        for column in columns:
+            try:
+                column._get(obj)
+            except AttributeError:
+                pending.add(column)
+        if not pending:
+            return
+        tracking = _obj_tracking[obj]
+        tracking["deferred"] = pending
+        tracking["deferred_load"] = self
+        self.objs.add(obj)
+
+    def load(self):
+        with self._lock:
+            objs = [obj for obj in self.objs if get_deferred(obj)]
+            self.objs.clear()
+            if objs:
+                self.engine._load_deferred(objs, consistent=self.consistent)
+
+
+def get_deferred(obj):
+    """Deferred columns of an object that haven't been loaded."""
+    tracking = _obj_tracking.get(obj)
+    return tracking["deferred"] if tracking else _no_deferred_columns
+
+
+def load_deferred(obj, column):
+    """Load the deferred columns of every object loaded with this one.  Returns ``missing`` if the column isn't
+    deferred, or the object's item no longer exists."""
+    if column not in get_deferred(obj):
+        return missing
+    tracking = _obj_tracking[obj]
+    if tracking["profile"] is not None:
+        tracking["profile"].read.add(column)
+    tracking["deferred_load"].load()
+    try:
+        return column._get(obj)
+    except AttributeError:
+        return missing
+
+
+def set_profile(obj, profile):
+    """Record each lazy or deferred column of the object that's read in the profile."""
+    _obj_tracking[obj]["profile"] = profile
+
+
+def set_deferred(obj, attrs, codec, engine):
+    """Load an object's deferred columns from ``attrs``, and add their wire values to its snapshot.
+
+    Unlike :func:`~bloop.conditions.hydrate`, the object's other columns and their snapshot are unchanged."""
+    context = engine._context
+    for column, (dynamo_name, _, load) in zip(codec.columns, codec.load):
+        column._set(obj, load(attrs.get(dynamo_name, None), context=context))
+    mark(obj, codec.columns)
+    if obj.Meta.atomic_tracking:
+        snapshot = dict(_get_state(obj, "snapshot") or {})
+        snapshot.update((column, attrs.get(column.dynamo_name, None)) for column in codec.columns)
+        _set_state(obj, "snapshot", snapshot)
+
+
 # END CONDITION TRACKING ====================================================================== END CONDITION TRACKING
 
 
@@ -113,6 +327,55 @@ def is_empty(ref):
     return ref.type == "value" and ref.value is None
 
 
+def collection_delta(previous, current):
+    """The smallest update that changes a dumped Set, List, or Map from ``previous`` to ``current``.
+
+    Returns a tuple of (action, dumped value) where action is one of "add" or "delete" for a Set, "append" for
+    a List, "paths" for a Map, or "unchanged".  Returns None if the full value has to be set.
+
+    The value for "paths" is a list of (path, dumped value) for each nested value that changed, where the value is
+    None if it was removed.
+    """
+    if current is None:
+        return None
+    (backing_type, old), = previous.items()
+    (current_type, new), = current.items()
+    if backing_type != current_type:
+        return None
+    if backing_type == MAP:
+        changes = list(_map_changes(old, new, ()))
+        return ("paths", changes) if changes else ("unchanged", None)
+    if backing_type == LIST:
+        if new == old:
+            return "unchanged", None
+        if len(new) > len(old) and new[:len(old)] == old:
+            return "append", {LIST: new[len(old):]}
+        return None
+    old_values, new_values = set(old), set(new)
+    added = [value for value in new if value not in old_values]
+    removed = [value for value in old if value not in new_values]
+    # An UpdateExpression can't both ADD and DELETE the same attribute
+    if added and removed:
+        return None
+    if added:
+        return "add", {backing_type: added}
+    if removed:
+        return "delete", {backing_type: removed}
+    return "unchanged", None
+
+
+def _map_changes(old, new, path):
+    for key in sorted(set(old) | set(new)):
+        old_value, new_value = old.get(key, None), new.get(key, None)
+        if old_value == new_value:
+            continue
+        # Only descend into maps that exist in both; anything else is replaced at this path
+        if old_value is not None and new_value is not None and MAP in old_value and MAP in new_value:
+            yield from _map_changes(old_value[MAP], new_value[MAP], path + (key,))
+        else:
+            yield path + (key,), new_value
+
+
 class ReferenceTracker:
     """De-dupes reference names for the same path segments and generates unique placeholders for all
     names, paths, and values.  The reference tracker can also forget references if, for example, a value fails to
@@ -175,7 +438,11 @@ class ReferenceTracker:
                 typedef = typedef[segment]
             if inner:
                 typedef = typedef.inner_typedef
-            value = self.engine._dump(typedef, value)
+            if isinstance(value, Param):
+                # Dumped when the prepared search is executed
+                value = Param(value.name, typedef=typedef)
+            else:
+                value = self.engine._dump(typedef, value)
 
         self.attr_values[ref] = value
         self.counts[ref] += 1
@@ -254,11 +521,16 @@ class ReferenceTracker:
                     del self.name_attr_index[path_segment]
 
 
-def render(engine, obj=None, filter=None, projection=None, key=None, atomic=None, condition=None, update=None):
+def render(
+        engine, obj=None, filter=None, projection=None, key=None, atomic=None, condition=None, update=None,
+        updates=None):
+    # Expressions without an object only depend on the structure of their conditions
+    if obj is None and not (atomic or update):
+        return engine.render_cache.render(engine, filter=filter, projection=projection, key=key, condition=condition)
     renderer = ConditionRenderer(engine)
     renderer.render(
         obj=obj, condition=condition,
-        atomic=atomic, update=update,
+        atomic=atomic, update=update, updates=updates,
         filter=filter, projection=projection, key=key,
     )
     return renderer.rendered
@@ -297,7 +569,9 @@ class ConditionRenderer:
         self.engine = engine
         self.expressions = {}
 
-    def render(self, obj=None, condition=None, atomic=False, update=False, filter=None, projection=None, key=None):
+    def render(
+            self, obj=None, condition=None, atomic=False, update=False, filter=None, projection=None, key=None,
+            updates=None):
         """Main entry point for rendering multiple expressions.  All parameters are optional, except obj when
         atomic or update are True.
 
@@ -310,6 +584,8 @@ class ConditionRenderer:
             a "ConditionExpression".  Default is False.
         :param bool update: *(Optional)*  True if an "UpdateExpression" should be rendered for ``obj``.
             Default is False.
+        :param dict updates: *(Optional)* Column -> :class:`~bloop.conditions.Increment` rendered in the
+            "UpdateExpression" instead of the column's local value.  Default is None.
         :param filter: *(Optional)* A filter condition for a query or scan, rendered as a "FilterExpression".
             Default is None.
         :type filter: :class:`~bloop.conditions.BaseCondition`
@@ -333,20 +609,23 @@ class ConditionRenderer:
 
         # Condition requires a bit of work, because either one can be empty/false
         condition = (condition or Condition()) & (get_snapshot(obj) if atomic else Condition())
+        # Writes to a versioned object only succeed if DynamoDB still has the local version
+        if obj is not None and obj.Meta.version_column is not None:
+            condition &= get_version_condition(obj)
         if condition:
             self.render_condition_expression(condition)
 
         if update:
-            self.render_update_expression(obj)
+            self.render_update_expression(obj, updates=updates)
 
     def render_condition_expression(self, condition):
-        self.expressions["ConditionExpression"] = condition.render(self)
+        self.expressions["ConditionExpression"] = normalize(condition).render(self)
 
     def render_filter_expression(self, condition):
-        self.expressions["FilterExpression"] = condition.render(self)
+        self.expressions["FilterExpression"] = normalize(condition).render(self)
 
     def render_key_expression(self, condition):
-        self.expressions["KeyConditionExpression"] = condition.render(self)
+        self.expressions["KeyConditionExpression"] = normalize(condition).render(self)
 
     def render_projection_expression(self, columns):
         included = set()
@@ -359,32 +638,133 @@ class ConditionRenderer:
             ref_names.append(ref.name)
         self.expressions["ProjectionExpression"] = ", ".join(ref_names)
 
-    def render_update_expression(self, obj):
-        updates = {
-            "set": [],
-            "remove": []}
+    def render_update_expression(self, obj, updates=None):
+        operations = updates or {}
+        updates = {"set": [], "remove": [], "add": [], "delete": []}
+        version = obj.Meta.version_column
+        # Sets, Lists, and Maps that were synced only send their changes
+        snapshot = _get_state(obj, "snapshot") or _no_lazy_values
         for column in sorted(
-                # Don't include key columns in an UpdateExpression
-                filter(lambda c: c not in obj.Meta.keys, get_marked(obj)),
+                # Don't include key columns in an UpdateExpression; the version column is always incremented below.
+                # Server-side operations replace the column's local value.
+                filter(lambda c: c not in obj.Meta.keys and c is not version and c not in operations,
+                       get_marked(obj)),
                 key=lambda c: c.dynamo_name):
-            name_ref = self.refs.any_ref(column=column)
-            value_ref = self.refs.any_ref(column=column, value=getattr(obj, column.model_name, None))
-            # Can't set to an empty value
-            if is_empty(value_ref):
-                self.refs.pop_refs(value_ref)
-                updates["remove"].append(name_ref.name)
-            # Setting this column to a value, or to another column's value
+            # Unread lazy columns can skip the load and dump
+            value = _lazy_values(obj).get(column, missing)
+            previous = snapshot.get(column, None)
+            if previous is not None and column.typedef.backing_type in {LIST, MAP, *SETS}:
+                if value is missing:
+                    value = self.engine._dump(column.typedef, getattr(obj, column.model_name, None))
+                delta = collection_delta(previous, value)
+                if delta is not None:
+                    self._render_delta(updates, column, *delta)
+                    continue
+            if value is missing:
+                self._render_value(updates, column, getattr(obj, column.model_name, None))
             else:
-                updates["set"].append("{}={}".format(name_ref.name, value_ref.name))
-
+                self._render_value(updates, column, value, dumped=True)
+
+        if version is not None:
+            name_ref = self.refs.any_ref(column=version)
+            one_ref = self.refs.any_ref(column=version, value=1)
+            # A new object doesn't have a version to increment yet
+            if getattr(obj, version.model_name, None) is None:
+                updates["set"].append("{}={}".format(name_ref.name, one_ref.name))
+            else:
+                updates["set"].append("{0}={0}+{1}".format(name_ref.name, one_ref.name))
+
+        for column, operation in sorted(operations.items(), key=lambda item: item[0].dynamo_name):
+            if not isinstance(operation, Increment):
+                raise InvalidCondition("Unknown update operation {!r} for {!r}.".format(operation, column))
+            if column in obj.Meta.keys or column is version:
+                raise InvalidCondition("Can't increment the key or version column {!r}.".format(column))
+            self._render_increment(updates, column, operation)
+
+        self._render_updates(updates)
+
+    def render_model_update_expression(self, model, set=None, remove=None):
+        """Render an "UpdateExpression" for a model's columns without an object, tracking, or snapshot.
+
+        :param model: The model whose columns are updated.
+        :param dict set: *(Optional)* Column -> value to set.  A value that dumps to None removes the column, and an
+            :class:`~bloop.conditions.Increment` is rendered as an ``ADD``.  Default is None.
+        :param remove: *(Optional)* Columns to remove.  Default is None.
+        :type remove: iterable of :class:`~bloop.models.Column`
+        :raises bloop.exceptions.InvalidCondition: if a column is a key, or isn't one of the model's columns.
+        """
+        updates = {"set": [], "remove": [], "add": [], "delete": []}
+        set, remove = set or {}, remove or []
+        for column in [*set, *remove]:
+            if column not in model.Meta.columns:
+                raise InvalidCondition("{!r} isn't a column of {!r}.".format(column, model.__name__))
+            if column in model.Meta.keys:
+                raise InvalidCondition("Can't update the key column {!r}.".format(column))
+
+        for column, value in sorted(set.items(), key=lambda item: item[0].dynamo_name):
+            if isinstance(value, Increment):
+                self._render_increment(updates, column, value)
+            else:
+                self._render_value(updates, column, value)
+        for column in sorted(remove, key=lambda c: c.dynamo_name):
+            updates["remove"].append(self.refs.any_ref(column=column).name)
+        self._render_updates(updates)
+
+    def _render_value(self, updates, column, value, dumped=False):
+        name_ref = self.refs.any_ref(column=column)
+        value_ref = self.refs.any_ref(column=column, value=value, dumped=dumped)
+        # Can't set to an empty value
+        if is_empty(value_ref):
+            self.refs.pop_refs(value_ref)
+            updates["remove"].append(name_ref.name)
+        # Setting this column to a value, or to another column's value
+        else:
+            updates["set"].append("{}={}".format(name_ref.name, value_ref.name))
+
+    def _render_increment(self, updates, column, operation):
+        # ADD is an update action, not a condition operator, so it isn't in SUPPORTED_OPERATIONS
+        if column.typedef.backing_type != NUMBER:
+            raise InvalidCondition("Can't increment the non-numeric column {!r}.".format(column))
+        name_ref = self.refs.any_ref(column=column)
+        value_ref = self.refs.any_ref(column=column, value=operation.value)
+        # ADD treats a missing attribute as 0, where SET x = x + :v would fail
+        updates["add"].append("{} {}".format(name_ref.name, value_ref.name))
+
+    def _render_updates(self, updates):
         expression = ""
         if updates["set"]:
             expression += "SET " + ", ".join(updates["set"])
         if updates["remove"]:
             expression += " REMOVE " + ", ".join(updates["remove"])
+        if updates["add"]:
+            expression += " ADD " + ", ".join(updates["add"])
+        if updates["delete"]:
+            expression += " DELETE " + ", ".join(updates["delete"])
         if expression:
             self.expressions["UpdateExpression"] = expression.strip()
 
+    def _render_delta(self, updates, column, action, value):
+        if action == "unchanged":
+            return
+        if action == "paths":
+            for path, path_value in value:
+                proxy = column
+                for segment in path:
+                    proxy = proxy[segment]
+                name_ref = self.refs.any_ref(column=proxy)
+                if path_value is None:
+                    updates["remove"].append(name_ref.name)
+                else:
+                    value_ref = self.refs.any_ref(column=proxy, value=path_value, dumped=True)
+                    updates["set"].append("{}={}".format(name_ref.name, value_ref.name))
+            return
+        name_ref = self.refs.any_ref(column=column)
+        value_ref = self.refs.any_ref(column=column, value=value, dumped=True)
+        if action == "append":
+            updates["set"].append("{0}=list_append({0}, {1})".format(name_ref.name, value_ref.name))
+        else:
+            updates[action].append("{} {}".format(name_ref.name, value_ref.name))
+
     @property
     def rendered(self):
         """The rendered wire format for all conditions that have been rendered.  Rendered conditions are never
@@ -397,6 +777,225 @@ class ConditionRenderer:
         return expressions
 
 
+class _Uncacheable(Exception):
+    """The condition can't be rendered from its structure alone"""
+
+
+def _shape(condition, values):
+    """Hashable structure of a condition, without its values.  Values are appended to ``values`` in render order."""
+    if condition is None:
+        return None
+    # Dumped values come from snapshots, and Params are bound by a QueryTemplate
+    if condition.dumped:
+        raise _Uncacheable
+    if condition.operation is None:
+        return ()
+    if condition.operation in ("and", "or", "not"):
+        return (condition.operation, *(_shape(value, values) for value in condition.values))
+    shape = [condition.operation, _column_shape(condition.column)]
+    for value in condition.values:
+        if isinstance(value, Param):
+            raise _Uncacheable
+        # None and other columns change the rendered expression; anything else is a value placeholder
+        if value is None:
+            shape.append(None)
+        elif isinstance(value, ComparisonMixin):
+            shape.append(_column_shape(value))
+        else:
+            shape.append(Param)
+            values.append(value)
+    return tuple(shape)
+
+
+def _column_shape(column):
+    # Columns aren't compared directly since their __eq__ builds a condition
+    column, path = proxied(column), path_of(column)
+    return column.model, column.model_name, tuple(path)
+
+
+def _template(condition, index):
+    """Copy of a condition with each value replaced by a Param, numbered in the same order as _shape"""
+    if condition is None or condition.operation is None:
+        return condition
+    template = copy.copy(condition)
+    if condition.operation in ("and", "or", "not"):
+        template.values = [_template(value, index) for value in condition.values]
+        return template
+    template.values = []
+    for value in condition.values:
+        if value is None or isinstance(value, ComparisonMixin):
+            template.values.append(value)
+        else:
+            template.values.append(Param(next(index)))
+    return template
+
+
+class RenderCache:
+    """Bounded LRU of rendered expressions, keyed by the structure of their conditions with the values left out.
+
+    A hit reuses the rendered expressions and names, and only dumps the new values.  Expressions for an object
+    (atomic conditions and updates) aren't cached.
+
+    :param int maxsize: The most structures to keep.  0 disables the cache.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        #: Number of renders that reused a cached expression.
+        self.hits = 0
+        #: Number of renders that weren't cached.
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all cached expressions and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def render(self, engine, filter=None, projection=None, key=None, condition=None):
+        """Render the expressions, reusing a cached render of the same structure.
+
+        Takes the same arguments as :func:`~bloop.conditions.ConditionRenderer.render`, without an object.
+        """
+        # Normalized first so equivalent conditions share a structure
+        filter, key, condition = normalize(filter), normalize(key), normalize(condition)
+        values = []
+        try:
+            cache_key = (
+                _shape(filter, values),
+                None if projection is None else tuple(_column_shape(column) for column in projection),
+                _shape(key, values),
+                _shape(condition, values))
+        except _Uncacheable:
+            cache_key = None
+
+        rendered = None
+        if cache_key is not None and self.maxsize:
+            with self._lock:
+                template = self._entries.get(cache_key, None)
+                if template is not None:
+                    self._entries.move_to_end(cache_key)
+            if template is None:
+                template = self._render_template(engine, filter, projection, key, condition)
+                with self._lock:
+                    self._entries[cache_key] = template
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                hit = False
+            else:
+                hit = True
+            rendered = self._bind(engine, template, values)
+            if rendered is not None:
+                with self._lock:
+                    if hit:
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+                return rendered
+
+        with self._lock:
+            self.misses += 1
+        renderer = ConditionRenderer(engine)
+        renderer.render(filter=filter, projection=projection, key=key, condition=condition)
+        return renderer.rendered
+
+    @staticmethod
+    def _render_template(engine, filter, projection, key, condition):
+        index = itertools.count()
+        renderer = ConditionRenderer(engine)
+        renderer.render(
+            filter=_template(filter, index), projection=projection,
+            key=_template(key, index), condition=_template(condition, index))
+        return renderer.rendered
+
+    @staticmethod
+    def _bind(engine, template, values):
+        rendered = dict(template)
+        if "ExpressionAttributeNames" in template:
+            rendered["ExpressionAttributeNames"] = dict(template["ExpressionAttributeNames"])
+        if "ExpressionAttributeValues" in template:
+            attr_values = {}
+            for ref, placeholder in template["ExpressionAttributeValues"].items():
+                value = engine._dump(placeholder.typedef, values[placeholder.name])
+                # Values that dump to None render differently, such as attribute_not_exists
+                if value is None:
+                    return None
+                attr_values[ref] = value
+            rendered["ExpressionAttributeValues"] = attr_values
+        return rendered
+
+
+class Param:
+    """Placeholder for a value that's provided each time a prepared query is executed.
+
+    Use :func:`~bloop.conditions.param` to create a placeholder in a condition.  When the condition is rendered,
+    the placeholder is attached to the type that will dump its value.
+
+    :param str name: The keyword argument that provides this value.
+    :param typedef: *(Optional)* The type to dump the value with.  Set when the condition is rendered.
+    """
+    def __init__(self, name, typedef=None):
+        self.name = name
+        self.typedef = typedef
+
+    def __repr__(self):
+        return "<Param[{}]>".format(self.name)
+
+
+def param(name):
+    """Create a placeholder value for a condition in :func:`Engine.prepare_query <bloop.engine.Engine.prepare_query>`.
+
+    .. code-block:: python
+
+        by_email = engine.prepare_query(User.by_email, key=User.email == param("email"))
+        user = by_email(email="user@domain.com").one()
+
+    :param str name: The keyword argument that provides this value.
+    :rtype: :class:`~bloop.conditions.Param`
+    """
+    return Param(name)
+
+
+class Increment:
+    """Server-side change to a numeric column, rendered as an ``ADD`` in the UpdateExpression.
+
+    Use :func:`~bloop.conditions.increment` or :func:`~bloop.conditions.decrement` to create an increment.
+
+    :param value: The amount to add to the column's value in DynamoDB.  Can be negative.
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return "<Increment[{}]>".format(self.value)
+
+
+def increment(value=1):
+    """Add to a numeric column in DynamoDB without reading it first.
+
+    .. code-block:: python
+
+        engine.save(post, updates={Post.views: increment(1)})
+
+    :param value: *(Optional)* The amount to add.  Default is 1.
+    :rtype: :class:`~bloop.conditions.Increment`
+    """
+    return Increment(value)
+
+
+def decrement(value=1):
+    """Subtract from a numeric column in DynamoDB without reading it first.
+
+    :param value: *(Optional)* The amount to subtract.  Default is 1.
+    :rtype: :class:`~bloop.conditions.Increment`
+    """
+    return Increment(-value)
+
+
 # END RENDERING ======================================================================================== END RENDERING
 
 
@@ -421,6 +1020,43 @@ class BaseCondition:
     def render(self, renderer):
         raise NotImplementedError
 
+    def compile(self, engine=None):
+        """Returns a function that evaluates this condition against a single object.
+
+        Values are dumped once, so the function is much faster than :func:`evaluate` when the same condition
+        checks many objects.
+
+        .. code-block:: python
+
+            >>> is_adult = (User.age >= 18).compile()
+            >>> adults = [user for user in cached_users if is_adult(user)]
+
+        :param engine: *(Optional)* Passed to custom types in the dump context.
+        :return: A function that takes a model instance or a dict of DynamoDB attributes, and returns a bool.
+        :raises bloop.exceptions.InvalidCondition: if the condition can't be evaluated, such as
+            a comparison against None or an unbound :func:`~bloop.conditions.param`.
+        """
+        return compile_condition(self, {"engine": engine})
+
+    def evaluate(self, obj, engine=None):
+        """Evaluate this condition the way DynamoDB would against a model instance or a dict of DynamoDB attributes.
+
+        .. code-block:: python
+
+            >>> condition = User.email.begins_with("admin@") & User.name.is_not(None)
+            >>> condition.evaluate(user)
+            True
+            >>> condition.evaluate({"email": {"S": "admin@example.com"}})
+            False
+
+        :param obj: A model instance, or a dict of DynamoDB attributes keyed by each column's ``dynamo_name``
+            such as a stream record's image.
+        :param engine: *(Optional)* Passed to custom types in the dump context.
+        :return: True if the condition is met.
+        :raises bloop.exceptions.InvalidCondition: if the condition can't be evaluated.
+        """
+        return self.compile(engine)(obj)
+
     def __invert__(self):
         if self.operation is None:
             return self
@@ -939,6 +1575,280 @@ def iter_conditions(condition):
             conditions.extend(reversed(condition.values))
 
 
+def normalize(condition):
+    """Simplify a condition before it's rendered.  The condition isn't modified.
+
+    * Nested AND and OR conditions are flattened into their parent
+    * Duplicate clauses and empty conditions are removed from AND and OR
+    * Within an OR, two or more ``==`` and ``in_`` clauses on the same path are merged into one ``in_``
+    * Within an AND, one ``>=`` and one ``<=`` clause on the same path are merged into ``between`` when the lower
+      bound is at most the upper bound
+
+    Clauses compared to None or another column aren't merged.
+
+    .. code-block:: python
+
+        >>> normalize((User.age == 3) | ((User.age == 4) | User.name.is_(None)) | Condition())
+        ((User.age in [3, 4]) | (User.name == None))
+    """
+    if condition is None or condition.operation not in ("and", "or", "not"):
+        return condition
+    if condition.operation == "not":
+        inner = normalize(condition.values[0])
+        return condition if inner is condition.values[0] else NotCondition(inner)
+    # Still fails to render
+    if not condition.values:
+        return condition
+
+    operation = condition.operation
+    clauses = []
+    # Equal clauses always have the same key, so each clause is only compared to the few that share its key
+    seen = collections.defaultdict(list)
+    for value in condition.values:
+        value = normalize(value)
+        for clause in (value.values if value.operation == operation else [value]):
+            if not clause:
+                continue
+            same_key = seen[_clause_key(clause)]
+            if any(clause == existing for existing in same_key):
+                continue
+            same_key.append(clause)
+            clauses.append(clause)
+
+    if operation == "or":
+        clauses = _merge_in(clauses)
+    else:
+        clauses = _merge_between(clauses)
+    if not clauses:
+        return Condition()
+    if len(clauses) == 1:
+        return clauses[0]
+    return condition.__class__(*clauses)
+
+
+# DynamoDB allows at most 100 values in an IN clause
+MAX_IN_VALUES = 100
+
+
+def _plain(value):
+    return value is not None and not isinstance(value, ComparisonMixin)
+
+
+def _path_key(column):
+    return id(proxied(column)), tuple(path_of(column))
+
+
+def _clause_key(condition):
+    """Hashable key that's the same for any two equal conditions.  Unhashable values are left out of the key."""
+    if condition.operation in ("and", "or", "not"):
+        return (condition.operation, *(_clause_key(value) for value in condition.values))
+    # Columns as values are compared with `is`
+    values = tuple(
+        ("column", id(value)) if isinstance(value, ComparisonMixin) else value
+        for value in condition.values)
+    try:
+        hash(values)
+    except TypeError:
+        values = len(values)
+    return condition.operation, _path_key(condition.column), values
+
+
+def _merge_in(clauses):
+    groups = collections.defaultdict(list)
+    for i, clause in enumerate(clauses):
+        if clause.operation in ("==", "in") and not clause.dumped and all(map(_plain, clause.values)):
+            groups[_path_key(clause.column)].append(i)
+    merged = list(clauses)
+    for indexes in groups.values():
+        values = [value for i in indexes for value in clauses[i].values]
+        if len(indexes) < 2 or len(values) > MAX_IN_VALUES:
+            continue
+        merged[indexes[0]] = InCondition(clauses[indexes[0]].column, values)
+        for i in indexes[1:]:
+            merged[i] = None
+    return [clause for clause in merged if clause is not None]
+
+
+def _merge_between(clauses):
+    groups = collections.defaultdict(lambda: {">=": [], "<=": []})
+    for i, clause in enumerate(clauses):
+        if clause.operation in (">=", "<=") and not clause.dumped and _plain(clause.values[0]):
+            groups[_path_key(clause.column)][clause.operation].append(i)
+    merged = list(clauses)
+    for group in groups.values():
+        if len(group[">="]) != 1 or len(group["<="]) != 1:
+            continue
+        lower, upper = clauses[group[">="][0]], clauses[group["<="][0]]
+        # BETWEEN with inverted bounds is rejected by DynamoDB, where the original condition only matched nothing.
+        # Values that can't be compared (such as params) are left alone.
+        try:
+            if not lower.values[0] <= upper.values[0]:
+                continue
+        except TypeError:
+            continue
+        first, second = sorted([group[">="][0], group["<="][0]])
+        merged[first] = BetweenCondition(lower.column, lower.values[0], upper.values[0])
+        merged[second] = None
+    return [clause for clause in merged if clause is not None]
+
+
+def compile_condition(condition, context):
+    """Build a function that evaluates the condition against an object or a dict of DynamoDB attributes.
+
+    Values are compared in DynamoDB's wire format: comparisons only match values of the same type, missing
+    attributes fail every comparison except ``!=``, and numbers compare by value."""
+    operation = condition.operation
+    if operation is None:
+        return lambda obj: True
+    if operation in ("and", "or"):
+        if not condition.values:
+            raise InvalidCondition("Invalid Condition: <{!r}> does not contain any Conditions.".format(condition))
+        fns = [compile_condition(value, context) for value in condition.values]
+        if operation == "and":
+            return lambda obj: all(fn(obj) for fn in fns)
+        return lambda obj: any(fn(obj) for fn in fns)
+    if operation == "not":
+        fn = compile_condition(condition.values[0], context)
+        return lambda obj: not fn(obj)
+
+    get = _attribute_getter(condition.column, context)
+    inner = operation == "contains"
+    operands = [_operand(condition, value, context, inner=inner) for value in condition.values]
+
+    if operation in ("==", "!="):
+        (operand, ), negate = operands, operation == "!="
+        # Against None: attribute_not_exists, attribute_exists
+        if operand is None:
+            return (lambda obj: get(obj) is not None) if negate else (lambda obj: get(obj) is None)
+        if negate:
+            return lambda obj: not _equal(get(obj), operand(obj))
+        return lambda obj: _equal(get(obj), operand(obj))
+
+    if any(operand is None for operand in operands):
+        raise InvalidCondition("Condition <{!r}> includes the value None.".format(condition))
+    if operation in ORDERINGS:
+        (operand, ), compare = operands, ORDERINGS[operation]
+        return lambda obj: _ordered(compare, get(obj), operand(obj))
+    if operation == "between":
+        lower, upper = operands
+
+        def between(obj):
+            value = get(obj)
+            return _ordered(operator.ge, value, lower(obj)) and _ordered(operator.le, value, upper(obj))
+        return between
+    if operation == "begins_with":
+        (operand, ) = operands
+        return lambda obj: _begins_with(get(obj), operand(obj))
+    if operation == "contains":
+        (operand, ) = operands
+        return lambda obj: _contains(get(obj), operand(obj))
+    if operation == "in":
+        if not operands:
+            raise InvalidCondition("Condition <{!r}> is missing values.".format(condition))
+
+        def in_(obj):
+            value = get(obj)
+            return any(_equal(value, operand(obj)) for operand in operands)
+        return in_
+    raise InvalidCondition("Can't evaluate the unknown operation {!r}".format(operation))
+
+
+ORDERINGS = {"<": operator.lt, ">": operator.gt, "<=": operator.le, ">=": operator.ge}
+
+
+def _attribute_getter(column, context):
+    """Returns a function that finds the column's comparable value in an object or attribute dict"""
+    path, column = path_of(column), proxied(column)
+
+    def get(obj):
+        if isinstance(obj, collections.abc.Mapping):
+            value = obj.get(column.dynamo_name)
+        else:
+            value = column.typedef._dump(getattr(obj, column.model_name, None), context=context)
+        for segment in path:
+            if value is None:
+                return None
+            if isinstance(segment, str):
+                value = value.get("M", {}).get(segment)
+            else:
+                values = value.get("L", [])
+                value = values[segment] if 0 <= segment < len(values) else None
+        return _comparable(value)
+    return get
+
+
+def _operand(condition, value, context, *, inner=False):
+    """Returns a function for the comparable value, or None if the value is None"""
+    if isinstance(value, ComparisonMixin):
+        return _attribute_getter(value, context)
+    if isinstance(value, Param):
+        raise InvalidCondition("Condition <{!r}> has an unbound param {!r}.".format(condition, value.name))
+    if not condition.dumped:
+        typedef = condition.column.typedef
+        for segment in path_of(condition.column):
+            typedef = typedef[segment]
+        if inner:
+            typedef = typedef.inner_typedef
+        value = typedef._dump(value, context=context)
+    value = _comparable(value)
+    if value is None:
+        return None
+    return lambda obj: value
+
+
+def _comparable(value):
+    """{"N": "3.0"} -> ("N", Decimal("3.0")) so that values compare and hash the way DynamoDB compares them"""
+    if value is None:
+        return None
+    (backing_type, inner), = value.items()
+    if backing_type in ("N", "B"):
+        inner = _scalar(backing_type, inner)
+    elif backing_type in SETS:
+        element_type = backing_type[0]
+        inner = frozenset((element_type, _scalar(element_type, element)) for element in inner)
+    elif backing_type == LIST:
+        inner = tuple(_comparable(element) for element in inner)
+    elif backing_type == MAP:
+        inner = frozenset((key, _comparable(element)) for key, element in inner.items())
+    return backing_type, inner
+
+
+def _scalar(backing_type, value):
+    if backing_type == "N":
+        return decimal.Decimal(value)
+    if backing_type == "B" and not isinstance(value, bytes):
+        return base64.b64decode(value)
+    return value
+
+
+def _equal(left, right):
+    return left is not None and left == right
+
+
+def _ordered(compare, left, right):
+    return (
+        left is not None and right is not None and
+        left[0] == right[0] and left[0] in ("S", "N", "B") and
+        compare(left[1], right[1]))
+
+
+def _begins_with(value, prefix):
+    return (
+        value is not None and prefix is not None and
+        value[0] == prefix[0] and value[0] in ("S", "B") and
+        value[1].startswith(prefix[1]))
+
+
+def _contains(value, operand):
+    if value is None or operand is None:
+        return False
+    if value[0] in ("S", "B"):
+        return value[0] == operand[0] and operand[1] in value[1]
+    if value[0] in SETS or value[0] == LIST:
+        return operand in value[1]
+    return False
+
+
 def iter_columns(condition):
     """Yield all columns in the condition or its inner conditions."""
     # Like iter_conditions, this can't live in each condition without going possibly infinite on the
@@ -1,18 +1,39 @@
+import collections
 import logging
+import sys
 
 import declare
 
-from .conditions import render
+from .conditions import (
+    ConditionRenderer,
+    DeferredLoad,
+    RenderCache,
+    get_deferred,
+    hydrate,
+    param,
+    render,
+    set_deferred,
+)
 from .exceptions import (
+    InvalidFilterCondition,
+    InvalidKeyCondition,
     InvalidModel,
     InvalidStream,
     MissingKey,
     MissingObjects,
+    TableMismatch,
     UnboundModel,
     UnknownType,
 )
 from .models import Index, ModelMetaclass
-from .search import Search
+from .search import (
+    AccessProfile,
+    MultiQueryIterator,
+    QueryTemplate,
+    Search,
+    SegmentedCount,
+    plan_search,
+)
 from .session import SessionWrapper
 from .signals import (
     before_create_table,
@@ -21,14 +42,19 @@ from .signals import (
     object_deleted,
     object_loaded,
     object_saved,
+    objects_loaded,
 )
 from .stream import Stream
-from .util import missing, unpack_from_dynamodb, walk_subclasses
+from .util import missing, walk_subclasses
 
 
 __all__ = ["Engine"]
 logger = logging.getLogger("bloop.engine")
 
+# load and dump are tuples of (dynamo_name, model_name, fn) with the typedef's bound _load or _dump.
+# columns are in the same order.
+Codec = collections.namedtuple("Codec", ["columns", "load", "dump"])
+
 
 def value_of(column):
     """value_of({'S': 'Space Invaders'}) -> 'Space Invaders'"""
@@ -52,18 +78,70 @@ def dump_key(engine, obj):
     returns {dynamo_name: {type: value} for dynamo_name in hash/range keys}
     """
     key = {}
-    for key_column in obj.Meta.keys:
-        key_value = getattr(obj, key_column.model_name, missing)
+    codec = engine._codec(obj.__class__, obj.Meta.keys)
+    for dynamo_name, model_name, dump in codec.dump:
+        key_value = getattr(obj, model_name, missing)
         if key_value is missing:
             raise MissingKey("{!r} is missing {}: {!r}".format(
-                obj, "hash_key" if key_column.hash_key else "range_key",
-                key_column.model_name
+                obj, "hash_key" if model_name == obj.Meta.hash_key.model_name else "range_key",
+                model_name
             ))
-        key_value = engine._dump(key_column.typedef, key_value)
-        key[key_column.dynamo_name] = key_value
+        key[dynamo_name] = dump(key_value, context=engine._context)
     return key
 
 
+def dump_item(engine, obj):
+    """dump every column of an object that has a value into a dynamo-friendly format.
+
+    This is the "Item" of a PutItem, or the "PutRequest" of a BatchWriteItem.
+
+    returns {dynamo_name: {type: value} for each column with a value}
+    """
+    item = {}
+    codec = engine._codec(obj.__class__, obj.Meta.columns)
+    for dynamo_name, model_name, dump in codec.dump:
+        value = dump(getattr(obj, model_name, None), context=engine._context)
+        if value is not None:
+            item[dynamo_name] = value
+    for key in obj.Meta.keys:
+        if key.dynamo_name not in item:
+            raise MissingKey("{!r} is missing {}: {!r}".format(
+                obj, "hash_key" if key is obj.Meta.hash_key else "range_key", key.model_name))
+    return item
+
+
+def load_returned(engine, obj, attrs, return_values):
+    """Load the attributes from a save or delete's "ReturnValues".
+
+    New values are loaded into ``obj``.  Old values are loaded into a new instance, or None if there wasn't an item.
+    """
+    model = obj.__class__
+    if return_values == "all_old":
+        if not attrs:
+            return None
+        obj, columns = model.Meta.init(), model.Meta.columns
+    elif return_values == "all_new":
+        columns = model.Meta.columns
+    else:
+        columns = {column for column in model.Meta.columns if column.dynamo_name in attrs}
+    hydrate(obj, attrs, engine._codec(model, columns), engine)
+    if engine.object_loaded_signals:
+        object_loaded.send(engine, engine=engine, obj=obj)
+    return obj
+
+
+def loaded_columns_of(obj):
+    """The columns that Engine.load fetches for an object: every column except deferred ones."""
+    if obj.Meta.deferred_columns:
+        return obj.Meta.columns - obj.Meta.deferred_columns
+    return obj.Meta.columns
+
+
+def validate_return_values(return_values, allowed):
+    if return_values is not None and return_values not in allowed:
+        raise ValueError("return_values must be one of {} but was {!r}.".format(sorted(allowed), return_values))
+
+
 def validate_not_abstract(*objs):
     for obj in objs:
         if obj.Meta.abstract:
@@ -71,6 +149,12 @@ def validate_not_abstract(*objs):
             raise InvalidModel("{!r} is abstract.".format(cls.__name__))
 
 
+def is_set_up(model):
+    """False when the model's class creation raised partway through, which still leaves it as a subclass of its
+    bases.  Meta.init and Meta.stream are set after the columns and indexes."""
+    return hasattr(model.Meta, "init") and hasattr(model.Meta, "stream")
+
+
 def validate_is_model(model):
     if not isinstance(model, ModelMetaclass):
         cls = model if isinstance(model, type) else model.__class__
@@ -93,12 +177,64 @@ class Engine:
 
     :param dynamodb: DynamoDB client.  Defaults to ``boto3.client("dynamodb")``.
     :param dynamodbstreams: DynamoDbStreams client.  Defaults to ``boto3.client("dynamodbstreams")``.
+    :param bool object_loaded_signals: Send :data:`~bloop.signals.object_loaded` for each loaded object.  When False,
+        only :data:`~bloop.signals.objects_loaded` is sent for each batch.  Default is True.
+    :param int render_cache_size: The most condition structures to keep in :attr:`render_cache`.  0 disables the
+        cache.  Default is 256.
+
+    .. attribute:: render_cache
+
+        :class:`~bloop.conditions.RenderCache` of query, scan, and count expressions.  Its ``hits`` and ``misses``
+        count how often a render reused an expression with the same structure.
     """
-    def __init__(self, *, dynamodb=None, dynamodbstreams=None):
+    def __init__(self, *, dynamodb=None, dynamodbstreams=None, object_loaded_signals=True, render_cache_size=256):
         # Unique namespace so the type engine for multiple bloop Engines
         # won't have the same TypeDefinitions
         self.type_engine = declare.TypeEngine.unique()
         self.session = SessionWrapper(dynamodb=dynamodb, dynamodbstreams=dynamodbstreams)
+        self.object_loaded_signals = object_loaded_signals
+        # Shared by every load and dump through a codec
+        self._context = {"engine": self}
+        # (model, frozenset of columns) -> Codec
+        self._codecs = {}
+        self.render_cache = RenderCache(maxsize=render_cache_size)
+        #: (mode, model, index, call site) -> :class:`~bloop.search.AccessProfile` for searches with projection="auto"
+        self.access_profiles = {}
+
+    def _access_profile(self, mode, model, index):
+        """The access profile for the code that called query or scan."""
+        # 0 is this method, 1 is query or scan
+        frame = sys._getframe(2)
+        site = "{}:{}".format(frame.f_code.co_filename, frame.f_lineno)
+        key = (mode, model, index, site)
+        profile = self.access_profiles.get(key)
+        if profile is None:
+            profile = self.access_profiles.setdefault(
+                key, AccessProfile(mode=mode, model=model, index=index, site=site))
+        return profile
+
+    def _codec(self, model, columns):
+        """Loaders and dumpers for a set of a model's columns.
+
+        Built once for each model and projection, so loading an item doesn't allocate a context or dispatch through
+        the type engine for each value.
+
+        :param model: The model that the columns belong to.
+        :param columns: Iterable of :class:`~bloop.models.Column` to build a codec for.
+        :rtype: Codec
+        :raises bloop.exceptions.UnboundModel: if the model isn't bound to this engine.
+        """
+        key = (model, frozenset(columns))
+        codec = self._codecs.get(key)
+        if codec is None:
+            if model not in self.type_engine.bound_types:
+                raise UnboundModel("{!r} is not bound.  Did you forget to call engine.bind?".format(model.__name__))
+            columns = sorted(key[1], key=lambda c: c.dynamo_name)
+            codec = self._codecs[key] = Codec(
+                columns=tuple(columns),
+                load=tuple((c.dynamo_name, c.model_name, c.typedef._load) for c in columns),
+                dump=tuple((c.dynamo_name, c.model_name, c.typedef._dump) for c in columns))
+        return codec
 
     def _dump(self, model, obj, context=None, **kwargs):
         context = context or {"engine": self}
@@ -114,6 +250,80 @@ class Engine:
         except declare.DeclareException as from_declare:
             fail_unknown(model, from_declare)
 
+    def _batch_get(self, objs, consistent, columns):
+        """Fetch the given columns of each object with BatchGetItem.
+
+        Objects that share a key are fetched once.  A table's request only includes a projection when some object
+        in it doesn't need all of its model's columns.
+
+        :param objs: Objects to fetch.
+        :param bool consistent: Use strongly consistent reads.
+        :param columns: Function that returns the set of columns to fetch for an object.
+        :return: A tuple of (found, not_loaded) where found is a list of (obj, attrs, columns) and not_loaded is
+            the set of objects that weren't found.
+        :raises bloop.exceptions.MissingKey: if any object doesn't provide a value for a key column.
+        """
+        table_index, object_index, request, projections = {}, {}, {}, {}
+
+        for obj in objs:
+            table_name = obj.Meta.table_name
+            key = dump_key(self, obj)
+            index = index_for(key)
+            obj_columns = columns(obj)
+
+            if table_name not in object_index:
+                table_index[table_name] = list(sorted(key.keys()))
+                object_index[table_name] = {}
+                request[table_name] = {"Keys": [], "ConsistentRead": consistent}
+                projections[table_name] = set()
+
+            if index not in object_index[table_name]:
+                request[table_name]["Keys"].append(key)
+                object_index[table_name][index] = {}
+            object_index[table_name][index][obj] = obj_columns
+            if projections[table_name] is not None:
+                if obj_columns is obj.Meta.columns:
+                    projections[table_name] = None
+                else:
+                    projections[table_name].update(obj.Meta.keys, obj_columns)
+
+        for table_name, projection in projections.items():
+            if projection is not None:
+                request[table_name].update(render(self, projection=projection))
+
+        response = self.session.load_items(request)
+
+        found = []
+        for table_name, list_of_attrs in response.items():
+            key_shape = table_index[table_name]
+            for attrs in list_of_attrs:
+                index = index_for(extract_key(key_shape, attrs))
+                for obj, obj_columns in object_index[table_name].pop(index).items():
+                    found.append((obj, attrs, obj_columns))
+
+        not_loaded = set()
+        for index in object_index.values():
+            for index_set in index.values():
+                not_loaded.update(index_set)
+        return found, not_loaded
+
+    def _load_deferred(self, objs, consistent=False):
+        """Fetch the pending deferred columns of each object in one BatchGetItem.
+
+        Objects whose items no longer exist are left without values for those columns.
+
+        :param objs: Objects with pending deferred columns.
+        :param bool consistent: Use strongly consistent reads.
+        """
+        pending = {obj: frozenset(get_deferred(obj)) for obj in objs}
+        for obj in objs:
+            get_deferred(obj).clear()
+        found, not_loaded = self._batch_get(objs, consistent, pending.__getitem__)
+        for obj, attrs, columns in found:
+            set_deferred(obj, attrs, self._codec(obj.__class__, columns), self)
+        if not_loaded:
+            logger.warning("failed to load deferred columns for {} objects".format(len(not_loaded)))
+
     def bind(self, model, *, skip_table_setup=False):
         """Create backing tables for a model and its non-abstract subclasses.
 
@@ -124,7 +334,7 @@ class Engine:
         # Make sure we're looking at models
         validate_is_model(model)
 
-        concrete = set(filter(lambda m: not m.Meta.abstract, walk_subclasses(model)))
+        concrete = set(filter(lambda m: is_set_up(m) and not m.Meta.abstract, walk_subclasses(model)))
         logger.debug("binding non-abstract models {}".format(
             sorted(c.__name__ for c in concrete)
         ))
@@ -147,28 +357,135 @@ class Engine:
 
             self.type_engine.register(model)
             self.type_engine.bind(context={"engine": self})
+            # Build codecs for the common projections up front
+            self._codec(model, model.Meta.columns)
+            self._codec(model, model.Meta.keys)
+            for index in model.Meta.indexes:
+                self._codec(model, index.projection["included"])
             model_bound.send(self, engine=self, model=model)
 
         logger.info("successfully bound {} models to the engine".format(len(concrete)))
 
-    def delete(self, *objs, condition=None, atomic=False):
+    def count(self, model_or_index, filter=None, consistent=False, segments=1, exact=True, callback=None, workers=8):
+        """Count the items in a table or index with a ``Select=COUNT`` scan, split into parallel segments.
+
+        .. code-block:: python
+
+            def report(count):
+                print("{} pages, {} users so far".format(count.pages, count.count))
+
+            users = engine.count(User, filter=User.verified.is_(True), segments=16, callback=report)
+            print(users.count, users.segments)
+
+        :param model_or_index: A model or index to count.  For example, ``User`` or ``User.by_email``.
+        :param filter: Filter condition.  Only matching objects will be counted.
+        :param bool consistent: Use `strongly consistent reads`__ if True.  Default is False.
+        :param int segments: Number of `parallel scan`__ segments, each scanned in its own thread.  Default is 1.
+        :param bool exact: When False, returns the approximate ``ItemCount`` from DescribeTable without scanning.
+            DynamoDB updates this value about every six hours.  Default is True.
+        :param callback: *(Optional)* Called with the :class:`~bloop.search.SegmentedCount` after each page of
+            any segment, to report progress.  Default is None.
+        :param int workers: Maximum number of segments to scan at once.  Default is 8.
+        :return: The completed count, with per-segment totals.
+        :rtype: :class:`~bloop.search.SegmentedCount`
+        :raises bloop.exceptions.InvalidFilterCondition: if ``exact`` is False and a filter is provided.
+        :raises bloop.exceptions.TableMismatch: if ``exact`` is False and the table doesn't have the index.
+
+        __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/HowItWorks.ReadConsistency.html
+        __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/QueryAndScan.html#QueryAndScanParallelScan
+        """
+        if isinstance(model_or_index, Index):
+            model, index = model_or_index.model, model_or_index
+        else:
+            model, index = model_or_index, None
+        validate_not_abstract(model)
+        prepared = Search(
+            mode="scan", engine=self, model=model, index=index, filter=filter,
+            projection="count", consistent=consistent).prepare()
+        if exact:
+            return SegmentedCount(prepared=prepared, segments=segments, workers=workers).run(callback=callback)
+
+        if filter is not None:
+            raise InvalidFilterCondition("An approximate count can not include a filter condition.")
+        description = self.session.describe_table(model.Meta.table_name)
+        if index is None:
+            item_count = description["ItemCount"]
+        else:
+            indexes = description.get("GlobalSecondaryIndexes", []) + description.get("LocalSecondaryIndexes", [])
+            item_count = next((i["ItemCount"] for i in indexes if i["IndexName"] == index.dynamo_name), None)
+            if item_count is None:
+                raise TableMismatch("The table {!r} doesn't have an index {!r}.".format(
+                    model.Meta.table_name, index.dynamo_name))
+        return SegmentedCount(prepared=prepared, segments=segments, item_count=item_count)
+
+    def delete(self, *objs, condition=None, atomic=False, return_values=None):
         """Delete one or more objects.
 
         :param objs: objects to delete.
         :param condition: only perform each delete if this condition holds.
         :param bool atomic: only perform each delete if the local and DynamoDB versions of the object match.
+        :param str return_values: *(Optional)* "all_old" to load each item as it was before the delete.
+        :return: When return_values is "all_old", a dict of each object to a new instance loaded from its item
+            before the delete, or None if there wasn't an item.
         :raises bloop.exceptions.ConstraintViolation: if the condition (or atomic) is not met.
         """
+        validate_return_values(return_values, {"all_old"})
         objs = set(objs)
         validate_not_abstract(*objs)
+        old = {}
         for obj in objs:
-            self.session.delete_item({
+            item = {
                 "TableName": obj.Meta.table_name,
                 "Key": dump_key(self, obj),
                 **render(self, obj=obj, atomic=atomic, condition=condition)
-            })
+            }
+            if return_values:
+                item["ReturnValues"] = return_values.upper()
+            attrs = self.session.delete_item(item)
+            if return_values:
+                old[obj] = load_returned(self, obj, attrs, return_values)
             object_deleted.send(self, engine=self, obj=obj)
         logger.info("successfully deleted {} objects".format(len(objs)))
+        if return_values:
+            return old
+
+    def find(self, model, condition=None, projection="all", consistent=False, forward=True, limit=None, lazy=False):
+        """Find the objects of a model that match a condition, choosing between a query and a scan.
+
+        The condition is split into a key condition and a filter for the table or index that reads the fewest items
+        while covering the condition and projection.  A scan is only used when nothing can be queried.
+
+        .. code-block:: pycon
+
+            >>> adults = engine.find(User, (User.email == "a@b") & (User.age >= 18))
+            >>> print(adults.explain())
+            Query User.by_email
+                key: (User.email == 'a@b')
+                filter: (User.age >= 18)
+                reason: hash key condition on User.by_email
+
+        :param model: The model to find.
+        :param condition: *(Optional)* Only matching objects will be included in the results.  Default is None.
+        :param projection:
+            "all", "count", a list of column names, or a list of :class:`~bloop.models.Column`.  When projection is
+            "count", you must advance the iterator to retrieve the count.
+        :param bool consistent: Use `strongly consistent reads`__ if True.  GSIs aren't considered.  Default is False.
+        :param bool forward: Query in ascending or descending order.  Default is True (ascending).
+        :param int limit: Stop after this many results.  Default is None (no limit).
+        :param bool lazy: Load each column of a result the first time it's read.  Default is False.
+        :return: A query or scan iterator.  Its ``explain()`` describes the chosen :class:`~bloop.search.Plan`.
+        :rtype: :class:`~bloop.search.QueryIterator` or :class:`~bloop.search.ScanIterator`
+
+        __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/HowItWorks.ReadConsistency.html
+        """
+        validate_not_abstract(model)
+        plan = plan_search(model, condition, projection=projection, consistent=consistent)
+        q = Search(
+            mode=plan.mode, engine=self, model=model, index=plan.index, key=plan.key, filter=plan.filter,
+            projection=plan.projection, consistent=consistent, forward=forward, limit=limit, lazy=lazy)
+        prepared = q.prepare()
+        prepared.plan = plan
+        return iter(prepared)
 
     def load(self, *objs, consistent=False):
         """Populate objects from DynamoDB.
@@ -183,48 +500,57 @@ class Engine:
         objs = set(objs)
         validate_not_abstract(*objs)
 
-        table_index, object_index, request = {}, {}, {}
+        found, not_loaded = self._batch_get(objs, consistent, loaded_columns_of)
+
+        loaded = []
+        deferred_load = DeferredLoad(self, consistent=consistent)
+        for obj, attrs, columns in found:
+            hydrate(obj, attrs, self._codec(obj.__class__, columns), self)
+            if obj.Meta.deferred_columns:
+                deferred_load.add(obj, obj.Meta.deferred_columns)
+            if self.object_loaded_signals:
+                object_loaded.send(self, engine=self, obj=obj)
+            loaded.append(obj)
+        if loaded:
+            objects_loaded.send(self, engine=self, objs=loaded)
+
+        if not_loaded:
+            logger.warning("loaded {} of {} objects".format(len(objs) - len(not_loaded), len(objs)))
+            raise MissingObjects("Failed to load some objects.", objects=not_loaded)
+        logger.info("successfully loaded {} objects".format(len(objs)))
 
-        for obj in objs:
-            table_name = obj.Meta.table_name
-            key = dump_key(self, obj)
-            index = index_for(key)
+    def prepare_query(
+            self, model_or_index, key, filter=None, projection="all", consistent=False, forward=True, limit=None):
+        """Validate and render a query once, to execute many times with different values.
 
-            if table_name not in object_index:
-                table_index[table_name] = list(sorted(key.keys()))
-                object_index[table_name] = {}
-                request[table_name] = {"Keys": [], "ConsistentRead": consistent}
+        Use :func:`~bloop.conditions.param` in the key or filter condition for each value that changes between
+        executions.  Each call to the template skips validation and rendering; only the param values are dumped.
 
-            if index not in object_index[table_name]:
-                request[table_name]["Keys"].append(key)
-                object_index[table_name][index] = set()
-            object_index[table_name][index].add(obj)
+        .. code-block:: python
 
-        response = self.session.load_items(request)
+            from bloop import param
 
-        for table_name, list_of_attrs in response.items():
-            for attrs in list_of_attrs:
-                key_shape = table_index[table_name]
-                key = extract_key(key_shape, attrs)
-                index = index_for(key)
-
-                for obj in object_index[table_name].pop(index):
-                    unpack_from_dynamodb(
-                        attrs=attrs, expected=obj.Meta.columns, engine=self, obj=obj)
-                    object_loaded.send(self, engine=self, obj=obj)
-                if not object_index[table_name]:
-                    object_index.pop(table_name)
-
-        if object_index:
-            not_loaded = set()
-            for index in object_index.values():
-                for index_set in index.values():
-                    not_loaded.update(index_set)
-            logger.warning("loaded {} of {} objects".format(len(objs) - len(not_loaded), len(objs)))
-            raise MissingObjects("Failed to load some objects.", objects=not_loaded)
-        logger.info("successfully loaded {} objects".format(len(objs)))
+            by_email = engine.prepare_query(User.by_email, key=User.email == param("email"))
+            user = by_email(email="user@domain.com").one()
 
-    def query(self, model_or_index, key, filter=None, projection="all", consistent=False, forward=True):
+        The parameters are the same as :func:`~bloop.engine.Engine.query`.
+
+        :return: A template that creates a :class:`~bloop.search.QueryIterator` when called with param values.
+        :rtype: :class:`~bloop.search.QueryTemplate`
+        """
+        if isinstance(model_or_index, Index):
+            model, index = model_or_index.model, model_or_index
+        else:
+            model, index = model_or_index, None
+        validate_not_abstract(model)
+        q = Search(
+            mode="query", engine=self, model=model, index=index, key=key, filter=filter,
+            projection=projection, consistent=consistent, forward=forward, limit=limit)
+        return QueryTemplate(q.prepare())
+
+    def query(
+            self, model_or_index, key, filter=None, projection="all", consistent=False, forward=True, limit=None,
+            lazy=False, hydrate=False):
         """Create a reusable :class:`~bloop.search.QueryIterator`.
 
         :param model_or_index: A model or index to query.  For example, ``User`` or ``User.by_email``.
@@ -233,10 +559,18 @@ class Engine:
             of a restricted set of conditions on the range key.
         :param filter: Filter condition.  Only matching objects will be included in the results.
         :param projection:
-            "all", "count", a list of column names, or a list of :class:`~bloop.models.Column`.  When projection is
-            "count", you must advance the iterator to retrieve the count.
+            "all", "count", "auto", a list of column names, or a list of :class:`~bloop.models.Column`.  When
+            projection is "count", you must advance the iterator to retrieve the count.  When projection is "auto",
+            the columns are chosen by the :class:`~bloop.search.AccessProfile` of the code calling query.
         :param bool consistent: Use `strongly consistent reads`__ if True.  Default is False.
         :param bool forward:  Query in ascending or descending order.  Default is True (ascending).
+        :param int limit: Stop after this many results.  Without a filter, each page requests at most the remaining
+            number of results, so DynamoDB doesn't read more items than needed.  Default is None (no limit).
+        :param bool lazy: Keep the raw attributes of each result, and load each column the first time it's read.
+            Useful when only a few columns of each result are used.  Default is False.
+        :param bool hydrate: When querying an index that doesn't include the projection, only read the keys from the
+            index and load each object from the table.  "all" is every column of the model.  Each page's loads run
+            while the next page is queried.  Can't be used with ``lazy``.  Default is False.
 
         :return: A reusable query iterator with helper methods.
         :rtype: :class:`~bloop.search.QueryIterator`
@@ -248,41 +582,147 @@ class Engine:
         else:
             model, index = model_or_index, None
         validate_not_abstract(model)
+        if lazy and hydrate:
+            raise ValueError("A query can't be both lazy and hydrate.")
+        profile = self._access_profile("query", model, index) if projection == "auto" else None
         q = Search(
             mode="query", engine=self, model=model, index=index, key=key, filter=filter,
-            projection=projection, consistent=consistent, forward=forward)
+            projection=projection, consistent=consistent, forward=forward, limit=limit, lazy=lazy, hydrate=hydrate,
+            profile=profile)
         return iter(q.prepare())
 
-    def save(self, *objs, condition=None, atomic=False):
+    def query_many(
+            self, model_or_index, keys, range=None, filter=None, projection="all", consistent=False, forward=True,
+            limit=None, ordered_by_range=False, workers=8):
+        """Query each hash key in ``keys`` concurrently, yielding the results of every query.
+
+        The query is validated and rendered once; each key's query runs in a pool of at most ``workers`` threads.
+
+        .. code-block:: python
+
+            results = engine.query_many(
+                Tweet, keys=user_ids,
+                range=Tweet.created > yesterday,
+                ordered_by_range=True, limit=50)
+
+        :param model_or_index: A model or index to query.  For example, ``User`` or ``User.by_email``.
+        :param keys: Hash key values to query.
+        :param range: *(Optional)* Condition on the range key, applied to every query.  Default is None.
+        :param filter: *(Optional)* Filter condition.  Only matching objects will be included in the results.
+        :param projection:
+            "all", "count", a list of column names, or a list of :class:`~bloop.models.Column`.  When projection is
+            "count", you must advance the iterator to retrieve the count.
+        :param bool consistent: Use `strongly consistent reads`__ if True.  Default is False.
+        :param bool forward:  Query in ascending or descending order.  Default is True (ascending).
+        :param int limit: *(Optional)* Maximum number of results across all keys.  Default is None (no limit).
+        :param bool ordered_by_range: Merge the results of every key in range key order.  Default is False, which
+            yields results as each page arrives.
+        :param int workers: Maximum number of concurrent queries.  Default is 8.
+        :return: An iterator over the results of every query.
+        :rtype: :class:`~bloop.search.MultiQueryIterator`
+
+        __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/HowItWorks.ReadConsistency.html
+        """
+        meta = model_or_index if isinstance(model_or_index, Index) else model_or_index.Meta
+        if ordered_by_range and meta.range_key is None:
+            raise InvalidKeyCondition("Can't order by range key for {!r} without a range key.".format(model_or_index))
+        key = meta.hash_key == param("key")
+        if range is not None:
+            key &= range
+        template = self.prepare_query(
+            model_or_index, key=key, filter=filter, projection=projection,
+            consistent=consistent, forward=forward, limit=limit)
+        return MultiQueryIterator(template=template, keys=keys, limit=limit, ordered=ordered_by_range, workers=workers)
+
+    def save(self, *objs, condition=None, atomic=False, updates=None, return_values=None, mode="update"):
         """Save one or more objects.
 
         :param objs: objects to save.
         :param condition: only perform each save if this condition holds.
         :param bool atomic: only perform each save if the local and DynamoDB versions of the object match.
+        :param dict updates: Column -> :func:`~bloop.conditions.increment` applied in DynamoDB without reading the
+            column first.  Unless return_values is set, each object's updated columns are loaded from the response.
+        :param str return_values: *(Optional)* "all_new" or "updated_new" to load each object's new values from the
+            response, or "all_old" to load each item as it was before the save.
+        :param str mode: *(Optional)* "update" to save each object's modified columns with UpdateItem, or "put" to
+            overwrite each item with all of the object's columns with PutItem.  A put can't use ``updates``, and only
+            supports "all_old" for return_values.  Default is "update".
+        :return: When return_values is "all_old", a dict of each object to a new instance loaded from its item
+            before the save, or None if there wasn't an item.
         :raises bloop.exceptions.ConstraintViolation: if the condition (or atomic) is not met.
+
+        If the model has a version column, each save only succeeds if DynamoDB has the local version, and the
+        local version is incremented after the save.
         """
+        if mode == "put":
+            if updates:
+                raise ValueError("A save with mode='put' can't use updates.")
+            validate_return_values(return_values, {"all_old"})
+        elif mode == "update":
+            validate_return_values(return_values, {"all_new", "updated_new", "all_old"})
+        else:
+            raise ValueError("mode must be one of ['put', 'update'] but was {!r}.".format(mode))
+        if updates and return_values is None:
+            return_values = "updated_new"
         objs = set(objs)
         validate_not_abstract(*objs)
+        old = {}
         for obj in objs:
-            self.session.save_item({
-                "TableName": obj.Meta.table_name,
-                "Key": dump_key(self, obj),
-                **render(self, obj=obj, atomic=atomic, condition=condition, update=True)
-            })
+            if mode == "put":
+                item = {
+                    "TableName": obj.Meta.table_name,
+                    "Item": dump_item(self, obj),
+                    **render(self, obj=obj, atomic=atomic, condition=condition)
+                }
+                version = obj.Meta.version_column
+                if version is not None:
+                    # Matches the local increment below
+                    next_version = (getattr(obj, version.model_name, None) or 0) + 1
+                    item["Item"][version.dynamo_name] = self._dump(version.typedef, next_version)
+            else:
+                item = {
+                    "TableName": obj.Meta.table_name,
+                    "Key": dump_key(self, obj),
+                    **render(self, obj=obj, atomic=atomic, condition=condition, update=True, updates=updates)
+                }
+            if return_values:
+                item["ReturnValues"] = return_values.upper()
+            if mode == "put":
+                attrs = self.session.put_item(item)
+            else:
+                attrs = self.session.save_item(item)
+            if return_values == "all_old":
+                old[obj] = load_returned(self, obj, attrs, return_values)
+            elif return_values:
+                load_returned(self, obj, attrs, return_values)
+            version = obj.Meta.version_column
+            # New values from the response already include the new version
+            if version is not None and return_values in {None, "all_old"}:
+                # Matches the increment in the UpdateExpression or Item
+                setattr(obj, version.model_name, (getattr(obj, version.model_name, None) or 0) + 1)
             object_saved.send(self, engine=self, obj=obj)
         logger.info("successfully saved {} objects".format(len(objs)))
+        if return_values == "all_old":
+            return old
 
-    def scan(self, model_or_index, filter=None, projection="all", consistent=False, parallel=None):
+    def scan(
+            self, model_or_index, filter=None, projection="all", consistent=False, parallel=None, limit=None,
+            lazy=False):
         """Create a reusable :class:`~bloop.search.ScanIterator`.
 
         :param model_or_index: A model or index to scan.  For example, ``User`` or ``User.by_email``.
         :param filter: Filter condition.  Only matching objects will be included in the results.
         :param projection:
-            "all", "count", a list of column names, or a list of :class:`~bloop.models.Column`.  When projection is
-            "count", you must exhaust the iterator to retrieve the count.
+            "all", "count", "auto", a list of column names, or a list of :class:`~bloop.models.Column`.  When
+            projection is "count", you must exhaust the iterator to retrieve the count.  When projection is "auto",
+            the columns are chosen by the :class:`~bloop.search.AccessProfile` of the code calling scan.
         :param bool consistent: Use `strongly consistent reads`__ if True.  Default is False.
         :param tuple parallel: Perform a `parallel scan`__.  A tuple of (Segment, TotalSegments)
             for this portion the scan. Default is None.
+        :param int limit: Stop after this many results.  Without a filter, each page requests at most the remaining
+            number of results, so DynamoDB doesn't read more items than needed.  Default is None (no limit).
+        :param bool lazy: Keep the raw attributes of each result, and load each column the first time it's read.
+            Useful when only a few columns of each result are used.  Default is False.
         :return: A reusable scan iterator with helper methods.
         :rtype: :class:`~bloop.search.ScanIterator`
 
@@ -294,9 +734,10 @@ class Engine:
         else:
             model, index = model_or_index, None
         validate_not_abstract(model)
+        profile = self._access_profile("scan", model, index) if projection == "auto" else None
         s = Search(
             mode="scan", engine=self, model=model, index=index, filter=filter,
-            projection=projection, consistent=consistent, parallel=parallel)
+            projection=projection, consistent=consistent, parallel=parallel, limit=limit, lazy=lazy, profile=profile)
         return iter(s.prepare())
 
     def stream(self, model, position):
@@ -338,3 +779,48 @@ class Engine:
         stream = Stream(model=model, engine=self)
         stream.move_to(position=position)
         return stream
+
+    def update(self, model, key, set=None, remove=None, condition=None):
+        """Update an item's columns without an object.
+
+        No object is created, tracked, or snapshotted, and no signals are sent.
+
+        .. code-block:: python
+
+            engine.update(
+                User, key={User.id: "some-user-id"},
+                set={User.email: "user@domain.com", User.logins: increment(1)},
+                remove=[User.nickname],
+                condition=User.verified.is_(True))
+
+        :param model: The model whose table has the item.
+        :param dict key: Column -> value for each of the model's key columns.
+        :param dict set: *(Optional)* Column -> value to set.  A value that dumps to None removes the column, and
+            :func:`~bloop.conditions.increment` adds to a numeric column.
+        :param remove: *(Optional)* Columns to remove.
+        :type remove: iterable of :class:`~bloop.models.Column`
+        :param condition: *(Optional)* Only perform the update if this condition holds.
+        :raises bloop.exceptions.MissingKey: if ``key`` doesn't have exactly the model's key columns.
+        :raises bloop.exceptions.InvalidCondition: if a key column is set or removed.
+        :raises bloop.exceptions.ConstraintViolation: if the condition is not met.
+        """
+        validate_is_model(model)
+        validate_not_abstract(model)
+        if key.keys() != model.Meta.keys:
+            raise MissingKey("{!r} needs values for exactly its key columns {} but got {}.".format(
+                model.__name__, sorted(c.model_name for c in model.Meta.keys), sorted(c.model_name for c in key)))
+        codec = self._codec(model, model.Meta.keys)
+        dumped_key = {
+            dynamo_name: dump(key[column], context=self._context)
+            for column, (dynamo_name, _, dump) in zip(codec.columns, codec.dump)}
+
+        renderer = ConditionRenderer(self)
+        if condition:
+            renderer.render_condition_expression(condition)
+        renderer.render_model_update_expression(model, set=set, remove=remove)
+        self.session.save_item({
+            "TableName": model.Meta.table_name,
+            "Key": dumped_key,
+            **renderer.rendered
+        })
+        logger.info("successfully updated 1 item in {!r}".format(model.Meta.table_name))
@@ -3,9 +3,10 @@ import logging
 
 import declare
 
-from .conditions import ComparisonMixin
+from .conditions import ComparisonMixin, get_deferred, load_deferred, load_lazy
 from .exceptions import InvalidIndex, InvalidModel, InvalidStream
 from .signals import model_created, object_modified
+from .types import Integer
 from .util import missing, unpack_from_dynamodb
 
 
@@ -15,7 +16,11 @@ logger = logging.getLogger("bloop.models")
 
 def loaded_columns(obj):
     """Yields each (model_name, value) tuple for all columns in an object that aren't missing"""
+    # Reading a deferred column would load it
+    deferred = get_deferred(obj)
     for column in sorted(obj.Meta.columns, key=lambda c: c.model_name):
+        if column in deferred:
+            continue
         value = getattr(obj, column.model_name, missing)
         if value is not missing:
             yield column.model_name, value
@@ -84,6 +89,8 @@ def validate_stream(stream):
 
 class ModelMetaclass(declare.ModelMetaclass):
     def __new__(mcs, name, bases, attrs):
+        if getattr(attrs.get("Meta"), "compact", False):
+            attrs["__slots__"] = compact_slots(bases, attrs)
         hash_fn = attrs.get("__hash__", missing)
         if hash_fn is None:
             raise InvalidModel("Models must be hashable.")
@@ -110,9 +117,13 @@ class ModelMetaclass(declare.ModelMetaclass):
         setdefault(meta, "abstract", False)
         setdefault(meta, "write_units", None)
         setdefault(meta, "read_units", None)
+        setdefault(meta, "compact", False)
+        setdefault(meta, "atomic_tracking", True)
 
         setup_columns(meta)
         setup_indexes(meta)
+        if meta.compact:
+            setup_compact(meta)
 
         # Entry point for model population. By default this is the
         # class's __init__ function. Custom models can specify the
@@ -147,6 +158,8 @@ def setup_columns(meta):
     meta.hash_key = None
     meta.range_key = None
     meta.keys = set()
+    meta.version_column = None
+    meta.deferred_columns = {column for column in meta.columns if column.deferred}
 
     if not meta.abstract:
         cls_name = meta.model.__name__
@@ -170,6 +183,21 @@ def setup_columns(meta):
         meta.hash_key = hash_keys[0]
         meta.keys.add(meta.hash_key)
 
+        version_columns = [c for c in meta.columns if c.version]
+        if len(version_columns) > 1:
+            raise InvalidModel("{!r} has more than one version column.".format(cls_name))
+        if version_columns:
+            version_column = version_columns[0]
+            if version_column in meta.keys:
+                raise InvalidModel("{!r} can't use a key as its version column.".format(cls_name))
+            if not isinstance(version_column.typedef, Integer):
+                raise InvalidModel("{!r} must use an Integer version column.".format(cls_name))
+            meta.version_column = version_column
+
+        for column in meta.deferred_columns:
+            if column in meta.keys or column.version:
+                raise InvalidModel("{!r} can't defer its key or version columns.".format(cls_name))
+
     for column in meta.columns:
         column.model = meta.model
 
@@ -184,6 +212,26 @@ def setup_columns(meta):
     }
 
 
+def compact_slots(bases, attrs):
+    """Slots for a compact model: one per column, a bitmask of marked columns, and the tracking state"""
+    slots = ["_bloop_" + name for name, value in attrs.items() if isinstance(value, Column)]
+    slots.extend(["_bloop_marked", "_bloop_snapshot", "_bloop_hydrated"])
+    # The object tracking for lazy columns still holds weak refs
+    if not any(base.__weakrefoffset__ for base in bases):
+        slots.append("__weakref__")
+    return tuple(slots)
+
+
+def setup_compact(meta):
+    """Point each column at its slot and assign its bit in the marked bitmask"""
+    for i, column in enumerate(sorted(meta.columns, key=lambda c: c.model_name)):
+        slot = meta.model.__dict__.get("_bloop_" + column.model_name)
+        if slot is None:
+            raise InvalidModel("Compact model {!r} can't inherit columns.".format(meta.model.__name__))
+        column._slot = slot
+        column._bit = 1 << i
+
+
 def setup_indexes(meta):
     """Filter indexes from fields, compute projection for each index"""
     # Don't put these in the metadata until they bind successfully.
@@ -217,6 +265,9 @@ class BaseModel(metaclass=ModelMetaclass):
     class Meta:
         abstract = True
 
+    # Subclasses have a __dict__ unless they're compact
+    __slots__ = ()
+
     def __init__(self, **attrs):
         # Only set values from **attrs if there's a
         # corresponding `model_name` for a column in the model
@@ -464,11 +515,21 @@ class Column(declare.Field, ComparisonMixin):
         A model can have at most one Column with
         ``range_key=True``.  Default is False.
     :param str name: *(Optional)* The index's name in in DynamoDB. Defaults to the index’s name in the model.
+    :param bool version: *(Optional)* True if this column is the model's version number.  Saves and deletes
+        are conditioned on the local value, and each save increments it.  Default is False.
+    :param bool deferred: *(Optional)* True to leave this column out of ``projection="all"`` and
+        :func:`Engine.load <bloop.engine.Engine.load>`.  The first time it's read from an object, it's loaded for every
+        object that was loaded with it in one BatchGetItem.  Default is False.
     """
-    def __init__(self, typedef, hash_key=False, range_key=False, name=None, **kwargs):
+    def __init__(self, typedef, hash_key=False, range_key=False, name=None, version=False, deferred=False, **kwargs):
         self.hash_key = hash_key
         self.range_key = range_key
+        self.version = version
+        self.deferred = deferred
         self._dynamo_name = name
+        # Storage and marked bit for compact models
+        self._slot = None
+        self._bit = 0
         kwargs['typedef'] = typedef
         super().__init__(**kwargs)
 
@@ -497,15 +558,47 @@ class Column(declare.Field, ComparisonMixin):
             return self.model_name
         return self._dynamo_name
 
+    def get(self, obj):
+        try:
+            return self._get(obj)
+        except AttributeError:
+            # Lazily loaded columns are loaded and cached the first time they're read
+            value = load_lazy(obj, self)
+            if value is missing:
+                # Deferred columns are loaded along with every other object's deferred columns from the same load
+                value = load_deferred(obj, self)
+            if value is missing:
+                raise
+            self._set(obj, value)
+            return value
+
     def set(self, obj, value):
-        super().set(obj, value)
+        self._set(obj, value)
         # Notify the tracking engine that this value was intentionally mutated
         object_modified.send(self, obj=obj, column=self, value=value)
 
     def delete(self, obj):
         try:
-            super().delete(obj)
+            self._delete(obj)
         finally:
             # Unlike set, we always want to mark on delete.  If we didn't, and the column wasn't loaded
             # (say from a query) then the intention "ensure this doesn't have a value" wouldn't be captured.
             object_modified.send(self, obj=obj, column=self, value=None)
+
+    # Storage without signals; compact models store values in slots
+    def _get(self, obj):
+        if self._slot is None:
+            return super().get(obj)
+        return self._slot.__get__(obj, None)
+
+    def _set(self, obj, value):
+        if self._slot is None:
+            super().set(obj, value)
+        else:
+            self._slot.__set__(obj, value)
+
+    def _delete(self, obj):
+        if self._slot is None:
+            super().delete(obj)
+        else:
+            self._slot.__delete__(obj)
@@ -1,21 +1,44 @@
 import collections
+import concurrent.futures
+import heapq
+import logging
+import threading
 
 import declare
 
-from .conditions import BaseCondition, iter_columns, render
+from .conditions import (
+    AndCondition,
+    BaseCondition,
+    ComparisonMixin,
+    DeferredLoad,
+    Param,
+    hydrate,
+    iter_columns,
+    normalize,
+    proxied,
+    render,
+    set_lazy,
+    set_profile,
+)
 from .exceptions import (
     ConstraintViolation,
+    InvalidCondition,
     InvalidFilterCondition,
     InvalidKeyCondition,
     InvalidProjection,
     InvalidSearchMode,
+    MissingObjects,
 )
 from .models import Column, GlobalSecondaryIndex
-from .signals import object_loaded
-from .util import printable_query, unpack_from_dynamodb
+from .session import BATCH_GET_ITEM_CHUNK_SIZE
+from .signals import object_loaded, objects_loaded
+from .util import printable_query
 
 
-__all__ = ["ScanIterator", "QueryIterator"]
+__all__ = [
+    "AccessProfile", "HydratingQueryIterator", "MultiQueryIterator", "Plan", "ScanIterator", "SegmentedCount",
+    "QueryIterator", "QueryTemplate"]
+logger = logging.getLogger("bloop.search")
 
 
 def search_repr(cls, model, index):
@@ -79,7 +102,11 @@ def validate_search_projection(model, index, projection):
         return None
 
     if projection == "all":
-        return (index or model.Meta).projection["included"]
+        included = (index or model.Meta).projection["included"]
+        # Deferred columns are only loaded when they're read
+        if model.Meta.deferred_columns:
+            return included - model.Meta.deferred_columns
+        return included
     elif isinstance(projection, str):
         raise InvalidProjection("The projection must be 'count', 'all', or a list of Columns to include.")
 
@@ -129,6 +156,29 @@ def validate_filter_condition(condition, available_columns, column_blacklist):
             raise InvalidFilterCondition("{!r} can not be included in the filter condition.".format(column))
 
 
+def promote_range_key(query_on, key, filter):
+    """Move a range key condition out of a query's filter and into its key condition.
+
+    Only promoted when the key condition is just the hash key, and exactly one clause of the filter's top-level AND
+    is a valid range key condition against values.  Clauses inside an OR or NOT are never promoted.
+
+    :return: A tuple of (key, filter, promoted) where promoted is the clause that moved, or None.
+    """
+    if filter is None or query_on.range_key is None or not check_hash_key(query_on, key):
+        return key, filter, None
+    normalized = normalize(filter)
+    clauses = normalized.values if normalized.operation == "and" else [normalized]
+    candidates = [
+        clause for clause in clauses
+        if check_range_key(query_on, clause) and not clause.dumped and
+        all(value is not None and not isinstance(value, ComparisonMixin) for value in clause.values)
+    ]
+    if len(candidates) != 1:
+        return key, filter, None
+    promoted = candidates[0]
+    return key & promoted, _and([clause for clause in clauses if clause is not promoted]), promoted
+
+
 def check_hash_key(query_on, key):
     """Only allows == against query_on.hash_key"""
     return (
@@ -158,6 +208,177 @@ def fail_bad_range(query_on):
     raise InvalidKeyCondition(msg.format(printable_query(query_on)))
 
 
+class Plan:
+    """How a search reads a model: the mode, the table or index, and the key and filter conditions.
+
+    Built by :func:`Engine.find <bloop.engine.Engine.find>` and every prepared search.  Available from a search
+    iterator as ``plan``, and described by its ``explain()``.
+
+    :param str mode: "query" or "scan".
+    :param model: :class:`~bloop.models.BaseModel` being searched.
+    :param index: :class:`~bloop.models.Index` to search, or None.
+    :param key: *(Query only)* Key condition.
+    :param filter: Filter condition, or None.
+    :param projection: The projection to search with.
+    :param str reason: *(Optional)* Why this plan was chosen.
+    """
+    def __init__(self, *, mode, model, index=None, key=None, filter=None, projection="all", reason=None):
+        self.mode = mode
+        self.model = model
+        self.index = index
+        self.key = key
+        self.filter = filter
+        self.projection = projection
+        self.reason = reason
+
+    def explain(self):
+        """Describe the plan.
+
+        .. code-block:: pycon
+
+            >>> print(engine.find(User, (User.email == "a@b") & (User.age >= 18)).explain())
+            Query User.by_email
+                key: (User.email == 'a@b')
+                filter: (User.age >= 18)
+                reason: hash key condition on User.by_email
+        """
+        lines = ["{} {}".format(self.mode.capitalize(), _target(self.model, self.index))]
+        if self.key is not None:
+            lines.append("    key: {!r}".format(self.key))
+        if self.filter is not None:
+            lines.append("    filter: {!r}".format(self.filter))
+        if self.reason is not None:
+            lines.append("    reason: {}".format(self.reason))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return search_repr(self.__class__, self.model, self.index)
+
+
+class AccessProfile:
+    """The columns read from the results of one query or scan call site that uses ``projection="auto"``.
+
+    The first search from the call site projects every column, and records each column that's read.  Later searches
+    project the keys and the columns that have been read.  Reading any other column loads it for every object in the
+    page with one BatchGetItem, and adds it to the profile's projection.
+
+    Profiles are kept in :attr:`Engine.access_profiles <bloop.engine.Engine.access_profiles>`.
+
+    :param str mode: "query" or "scan".
+    :param model: :class:`~bloop.models.BaseModel` being searched.
+    :param index: :class:`~bloop.models.Index` to search, or None.
+    :param str site: The call site, as "filename:lineno".
+    """
+    def __init__(self, *, mode, model, index, site):
+        self.mode = mode
+        self.model = model
+        self.index = index
+        self.site = site
+        #: Columns that have been read from the results
+        self.read = set()
+        #: Number of searches prepared from this profile
+        self.executions = 0
+        self.available = validate_search_projection(model, index, "all")
+        self.keys = (index or model.Meta).keys | model.Meta.keys
+
+    def projection(self):
+        """The columns to project in the next search: the keys, and every column that's been read."""
+        columns = self.keys | (self.read & self.available)
+        return sorted(columns, key=lambda column: column.model_name)
+
+    def suggest(self):
+        """The model names of the columns to project, to use as an explicit ``projection`` at the call site."""
+        return [column.model_name for column in self.projection()]
+
+    def __repr__(self):
+        return "<AccessProfile[{} {} at {}: {}]>".format(
+            self.mode, _target(self.model, self.index), self.site, ", ".join(self.suggest()))
+
+
+def plan_search(model, condition=None, projection="all", consistent=False):
+    """Choose the cheapest way to find the objects of a model that match a condition.
+
+    The table and each index are candidates when the condition's top-level AND has an equality against their hash
+    key.  A candidate is ranked by whether it also has a range key condition, whether its included columns cover the
+    projection and filter without fetching from the table, and then whether it's the table.  Candidates whose
+    available columns can't cover the projection and filter are skipped, as are GSIs when ``consistent`` is True.
+    Without any candidate, the plan is a scan of the table.
+
+    :return: The chosen :class:`~bloop.search.Plan`.
+    """
+    needed = validate_search_projection(model, None, projection)
+    needed = set() if needed is None else set(needed)
+    condition = normalize(condition)
+    if not condition:
+        clauses = []
+    elif condition.operation == "and":
+        clauses = list(condition.values)
+    else:
+        clauses = [condition]
+
+    best, best_rank = None, None
+    for index in [None] + sorted(model.Meta.indexes, key=lambda index: index.model_name):
+        if consistent and isinstance(index, GlobalSecondaryIndex):
+            continue
+        query_on = index or model.Meta
+        hash_clause = _key_clause(clauses, lambda clause: check_hash_key(query_on, clause), first=True)
+        if hash_clause is None:
+            continue
+        range_clause = _key_clause(clauses, lambda clause: check_range_key(query_on, clause), first=False)
+        remaining = [clause for clause in clauses if clause is not hash_clause and clause is not range_clause]
+        filtered = set()
+        for clause in remaining:
+            filtered.update(proxied(column) for column in iter_columns(clause))
+        columns = needed | filtered
+        # Filters can't include the key columns
+        if filtered & query_on.keys or not columns <= query_on.projection["available"]:
+            continue
+        rank = (range_clause is not None, columns <= query_on.projection["included"], index is None)
+        if best_rank is not None and rank <= best_rank:
+            continue
+        key = hash_clause if range_clause is None else hash_clause & range_clause
+        # Query an index for every column through an explicit projection, so non-projected columns are fetched
+        plan_projection = projection
+        if projection == "all" and index is not None:
+            plan_projection = list(needed)
+        best_rank = rank
+        best = Plan(
+            mode="query", model=model, index=index, key=key, filter=_and(remaining), projection=plan_projection,
+            reason="{} condition on {}".format(
+                "hash and range key" if range_clause is not None else "hash key", _target(model, index)))
+    if best is not None:
+        return best
+    return Plan(
+        mode="scan", model=model, filter=_and(clauses), projection=projection,
+        reason="no equality against the hash key of {} or its indexes".format(model.__name__))
+
+
+def _key_clause(clauses, check, *, first):
+    """The first matching key clause against a value, or the only one if first is False"""
+    matches = [
+        clause for clause in clauses
+        if check(clause) and not clause.dumped and
+        all(value is not None and not isinstance(value, ComparisonMixin) for value in clause.values)
+    ]
+    if not matches or (not first and len(matches) > 1):
+        return None
+    return matches[0]
+
+
+def _target(model, index):
+    if index is None:
+        return model.__name__
+    return "{}.{}".format(model.__name__, index.model_name)
+
+
+def _and(clauses):
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return AndCondition(*clauses)
+
+
 class Search:
     """A user-created search object.
 
@@ -176,6 +397,12 @@ class Search:
     :param bool forward: *(Query only)* Use ascending or descending order.  Default is True (ascending).
     :param tuple parallel: *(Scan only)* A tuple of (Segment, TotalSegments) for this portion of a `parallel scan`__.
             Default is None.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
+    :param bool lazy: *(Optional)* Load each column of a result the first time it's read.  Default is False.
+    :param bool hydrate: *(Query only)* Read only the keys from the index, and load each object from the table when
+        the index doesn't include the projection.  Default is False.
+    :param profile: *(Optional)* The :class:`~bloop.search.AccessProfile` that chooses the columns when projection is
+        "auto".  Default is None.
 
     __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/HowItWorks.ReadConsistency.html
     __ http://docs.aws.amazon.com/amazondynamodb/latest/developerguide/QueryAndScan.html#QueryAndScanParallelScan
@@ -183,7 +410,8 @@ class Search:
 
     def __init__(
             self, mode=None, engine=None, model=None, index=None, key=None, filter=None,
-            projection=None, consistent=False, forward=True, parallel=None):
+            projection=None, consistent=False, forward=True, parallel=None, limit=None, lazy=False, hydrate=False,
+            profile=None):
         self.mode = mode
         self.engine = engine
         self.model = model
@@ -194,6 +422,10 @@ class Search:
         self.consistent = consistent
         self.forward = forward
         self.parallel = parallel
+        self.limit = limit
+        self.lazy = lazy
+        self.hydrate = hydrate
+        self.profile = profile
 
     def __repr__(self):
         return search_repr(self.__class__, self.model, self.index)
@@ -211,7 +443,11 @@ class Search:
             projection=self.projection,
             consistent=self.consistent,
             forward=self.forward,
-            parallel=self.parallel
+            parallel=self.parallel,
+            limit=self.limit,
+            lazy=self.lazy,
+            hydrate=self.hydrate,
+            profile=self.profile
         )
         return p
 
@@ -221,10 +457,16 @@ class PreparedSearch:
 
      Creates :class:`~bloop.search.SearchModelIterator` objects which can be
      used to iterate the results of a query or search multiple times.
+
+     When a query's filter has a condition on the range key and its key condition doesn't, that condition is moved
+     into the key condition so DynamoDB doesn't read the items it would filter out.  The moved condition is
+     available as ``promoted``, which is None when nothing was moved.
      """
     def __init__(self):
         self.engine = None
         self.mode = None
+        self.lazy = False
+        self.hydrate = False
         self._iterator_cls = None
 
         self.model = None
@@ -237,29 +479,42 @@ class PreparedSearch:
         self._projection_mode = None
 
         self.filter = None
+        self.promoted = None
+        self.plan = None
+        self.profile = None
 
         self.forward = None
         self.parallel = None
+        self.limit = None
 
         self._request = None
 
     def prepare(
             self, engine=None, mode=None, model=None, index=None, key=None,
-            filter=None, projection=None, consistent=None, forward=None, parallel=None):
+            filter=None, projection=None, consistent=None, forward=None, parallel=None, limit=None, lazy=False,
+            hydrate=False, profile=None):
         """Validates the search parameters and builds the base request dict for each Query/Scan call."""
 
-        self.prepare_iterator_cls(engine, mode)
+        self.prepare_iterator_cls(engine, mode, lazy, hydrate)
         self.prepare_model(model, index, consistent)
         self.prepare_key(key)
+        if projection == "auto":
+            projection = self.prepare_profile(profile)
         self.prepare_projection(projection)
         self.prepare_filter(filter)
-        self.prepare_constraints(forward, parallel)
+        self.prepare_constraints(forward, parallel, limit)
 
         self.prepare_request()
+        self.plan = Plan(
+            mode=self.mode, model=self.model, index=self.index, key=self.key, filter=self.filter,
+            projection=projection,
+            reason="promoted {!r} from the filter".format(self.promoted) if self.promoted is not None else None)
 
-    def prepare_iterator_cls(self, engine, mode):
+    def prepare_iterator_cls(self, engine, mode, lazy=False, hydrate=False):
         self.engine = engine
         self.mode = mode
+        self.lazy = lazy
+        self.hydrate = hydrate and mode == "query"
         validate_search_mode(mode)
         self._iterator_cls = ScanIterator if mode == "scan" else QueryIterator
 
@@ -274,7 +529,28 @@ class PreparedSearch:
         self.key = key
         validate_key_condition(self.model, self.index, self.key)
 
+    def prepare_profile(self, profile):
+        """Projects every column while the profile hasn't seen a search, then the columns that it's seen read."""
+        if profile is None:
+            raise InvalidProjection("The projection 'auto' is only available from Engine.query and Engine.scan.")
+        if self.hydrate:
+            raise InvalidProjection("The projection 'auto' can't be used with hydrate.")
+        self.profile = profile
+        if profile.executions:
+            projection = profile.projection()
+            logger.debug("projecting {} for {!r}".format(profile.suggest(), profile))
+        else:
+            # Lazy columns record each read
+            self.lazy = True
+            projection = "all"
+        profile.executions += 1
+        return projection
+
     def prepare_projection(self, projection):
+        if self.hydrate:
+            self.prepare_hydrate(projection)
+            if self.hydrate:
+                return
         self._projected_columns = validate_search_projection(self.model, self.index, projection)
 
         if self._projected_columns is None:
@@ -285,19 +561,35 @@ class PreparedSearch:
             # don't load those when they'll be discarded immediately.
             self._projection_mode = "specific"
 
+    def prepare_hydrate(self, projection):
+        """Only reads keys from the index when it doesn't include the projection, which is loaded from the table."""
+        # Validated against the table, since the columns are loaded from there
+        columns = validate_search_projection(self.model, None, projection)
+        if self.index is None or columns is None or set(columns) <= self.index.projection["included"]:
+            self.hydrate = False
+            return
+        self._projected_columns = self.model.Meta.keys
+        self._projection_mode = "specific"
+        self._iterator_cls = HydratingQueryIterator
+
     def prepare_filter(self, filter):
         self.filter = filter
         if self.mode == "query":
+            query_on = self.index or self.model.Meta
+            self.key, self.filter, self.promoted = promote_range_key(query_on, self.key, self.filter)
+            if self.promoted is not None:
+                logger.debug("promoted {!r} from the filter to the key condition".format(self.promoted))
             # Query filters can't include the key columns
-            column_blacklist = (self.index or self.model.Meta).keys
+            column_blacklist = query_on.keys
         else:
             column_blacklist = set()
         available_columns = (self.index or self.model.Meta).projection["available"]
         validate_filter_condition(self.filter, available_columns, column_blacklist)
 
-    def prepare_constraints(self, forward, parallel):
+    def prepare_constraints(self, forward, parallel, limit=None):
         self.forward = forward
         self.parallel = parallel
+        self.limit = limit
 
     def prepare_request(self):
         request = self._request = {}
@@ -306,7 +598,7 @@ class PreparedSearch:
 
         if self.mode == "scan":
             if self.parallel:
-                request["Segments"], request["TotalSegments"] = self.parallel
+                request["Segment"], request["TotalSegments"] = self.parallel
         else:
             request["ScanIndexForward"] = self.forward
 
@@ -329,13 +621,22 @@ class PreparedSearch:
         return search_repr(self.__class__, self.model, self.index)
 
     def __iter__(self):
-        return self._iterator_cls(
+        iterator = self._iterator_cls(
             engine=self.engine,
             model=self.model,
             index=self.index,
-            request=self._request,
-            projected=self._projected_columns
+            # Each iterator tracks its own continuation token and page limit
+            request=dict(self._request),
+            projected=self._projected_columns,
+            limit=self.limit,
+            lazy=self.lazy
         )
+        if self.hydrate:
+            # Loads from the table can be consistent even when the index can't
+            iterator.consistent = bool(self.consistent)
+        iterator.plan = self.plan
+        iterator.profile = self.profile
+        return iterator
 
 
 class SearchIterator:
@@ -346,22 +647,28 @@ class SearchIterator:
     :param index: :class:`~bloop.models.Index` to search, or None.
     :param dict request: The base request dict for each search.
     :param set projected: Set of :class:`~bloop.models.Column` that should be included in each result.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
     """
     mode = "<mode-placeholder>"
+    #: The :class:`~bloop.search.Plan` this search was prepared from, or None
+    plan = None
 
-    def __init__(self, *, session, model, index, request, projected):
+    def __init__(self, *, session, model, index, request, projected, limit=None):
         self.session = session
         self.request = request
 
         self.model = model
         self.index = index
         self.projected = projected
+        self.limit = limit
 
         self.buffer = collections.deque()
 
         self._count = 0
         self._scanned = 0
         self._exhausted = False
+        # Page size hint from first() or one()
+        self._page_limit = None
 
     @property
     def count(self):
@@ -386,7 +693,11 @@ class SearchIterator:
         :raises bloop.exceptions.ConstraintViolation: No results.
         """
         self.reset()
-        value = next(self, None)
+        self._page_limit = 1
+        try:
+            value = next(self, None)
+        finally:
+            self._page_limit = None
         if value is None:
             raise ConstraintViolation("{} did not find any results.".format(self.mode.capitalize()))
         return value
@@ -398,12 +709,26 @@ class SearchIterator:
         :return: The unique result.
         :raises bloop.exceptions.ConstraintViolation: Not exactly one result.
         """
-        first = self.first()
-        second = next(self, None)
+        self.reset()
+        self._page_limit = 2
+        try:
+            first = next(self, None)
+            second = next(self, None)
+        finally:
+            self._page_limit = None
+        if first is None:
+            raise ConstraintViolation("{} did not find any results.".format(self.mode.capitalize()))
         if second is not None:
             raise ConstraintViolation("{} found more than one result.".format(self.mode.capitalize()))
         return first
 
+    def explain(self):
+        """Describe the search's :class:`~bloop.search.Plan`: the table or index it reads, its key and filter
+        conditions, and why it was chosen."""
+        if self.plan is None:
+            return repr(self)
+        return self.plan.explain()
+
     def reset(self):
         """Reset to the initial state, clearing the buffer and zeroing count and scanned."""
         self.buffer.clear()
@@ -411,6 +736,7 @@ class SearchIterator:
         self._scanned = 0
         self._exhausted = False
         self.request.pop("ExclusiveStartKey", None)
+        self.request.pop("Limit", None)
 
     @property
     def exhausted(self):
@@ -425,15 +751,7 @@ class SearchIterator:
 
     def __next__(self):
         while (not self._exhausted) and len(self.buffer) == 0:
-            response = self.session.search_items(self.mode, self.request)
-            continuation_token = self.request["ExclusiveStartKey"] = response.get("LastEvaluatedKey", None)
-            self._exhausted = not continuation_token
-
-            self._count += response["Count"]
-            self._scanned += response["ScannedCount"]
-
-            # Each item is a dict of attributes
-            self.buffer.extend(response.get("Items", []))
+            self._fetch_page()
 
         if self.buffer:
             return self.buffer.popleft()
@@ -442,6 +760,45 @@ class SearchIterator:
         # No more continue tokens (while not _exhausted)
         raise StopIteration
 
+    def _fetch_page(self):
+        """Makes a single Query or Scan call, adding any items to the buffer."""
+        self._prepare_limit()
+        response = self.session.search_items(self.mode, self.request)
+        continuation_token = self.request["ExclusiveStartKey"] = response.get("LastEvaluatedKey", None)
+        self._exhausted = not continuation_token
+
+        items, count = response.get("Items", []), response["Count"]
+        # Filtered searches don't send a Limit, so one page can hold more than the remaining limit.
+        # Drop the extra items, and don't follow the continuation token once the limit is reached.
+        if self.limit is not None and self._count + count >= self.limit:
+            count = self.limit - self._count
+            items = items[:count]
+            self._exhausted = True
+        self._count += count
+        self._scanned += response["ScannedCount"]
+
+        # Each item is a dict of attributes
+        self.buffer.extend(self._unpack_page(items))
+
+    def _unpack_page(self, items):
+        """Returns the buffered result for each item in a page."""
+        return items
+
+    def _prepare_limit(self):
+        """Sets the request's Limit so the next page doesn't read more items than the search can return."""
+        limits = []
+        # DynamoDB applies the Limit before the FilterExpression.  A small page size
+        # would split a filtered search across more calls without reading any less.
+        if "FilterExpression" not in self.request:
+            if self.limit is not None:
+                limits.append(self.limit - self._count)
+            if self._page_limit is not None:
+                limits.append(self._page_limit)
+        if limits:
+            self.request["Limit"] = min(limits)
+        else:
+            self.request.pop("Limit", None)
+
 
 class SearchModelIterator(SearchIterator):
     """Reusable search iterator that unpacks result dicts into model instances.
@@ -451,25 +808,67 @@ class SearchModelIterator(SearchIterator):
     :param index: :class:`~bloop.models.Index` to search, or None.
     :param dict request: The base request dict for each search call.
     :param set projected: Set of :class:`~bloop.models.Column` that should be included in each result.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
+    :param bool lazy: *(Optional)* Keep the raw values of each result, loading each column the first time it's read.
+        Default is False.
     """
-    def __init__(self, *, engine, model, index, request, projected):
+    #: The :class:`~bloop.search.AccessProfile` that records which columns are read, or None
+    profile = None
+
+    def __init__(self, *, engine, model, index, request, projected, limit=None, lazy=False):
         self.engine = engine
 
         self.model = model
+        self.lazy = lazy
+        # Codec for the projected columns; rebuilt if projected is replaced
+        self._codec = None
+        self._codec_columns = None
 
         super().__init__(
             session=engine.session, model=model, index=index,
-            request=request, projected=projected)
-
-    def __next__(self):
-        attrs = super().__next__()
-        obj = unpack_from_dynamodb(
-            attrs=attrs,
-            expected=self.projected,
-            model=self.model,
-            engine=self.engine)
-        object_loaded.send(self.engine, engine=self.engine, obj=obj)
-        return obj
+            request=request, projected=projected, limit=limit)
+
+    def _unpack_page(self, items):
+        """Loads each item of a page into an instance of the model, and sends the load signals."""
+        if not items:
+            return items
+        engine, init = self.engine, self.model.Meta.init
+        if self.lazy:
+            objs = []
+            for attrs in items:
+                obj = init()
+                set_lazy(obj, engine, attrs, self.projected)
+                objs.append(obj)
+        else:
+            if self._codec_columns is not self.projected:
+                self._codec = engine._codec(self.model, self.projected)
+                self._codec_columns = self.projected
+            codec = self._codec
+            objs = [hydrate(init(), attrs, codec, engine) for attrs in items]
+        self._defer(objs)
+        if engine.object_loaded_signals:
+            for obj in objs:
+                object_loaded.send(engine, engine=engine, obj=obj)
+        objects_loaded.send(engine, engine=engine, objs=objs)
+        return objs
+
+    def _defer(self, objs):
+        """Defers the model's deferred columns that weren't projected, so they're loaded for the whole page the
+        first time one is read.  With a profile, any column it left out is deferred."""
+        deferred = self.model.Meta.deferred_columns
+        if self.profile is not None:
+            deferred = deferred | self.profile.available
+            for obj in objs:
+                set_profile(obj, self.profile)
+        # An explicit projection is a list of columns
+        projected = set(self.projected)
+        deferred = deferred - projected
+        # Without the keys there's no way to load the rest of the item
+        if not deferred or not self.model.Meta.keys <= projected:
+            return
+        deferred_load = DeferredLoad(self.engine, consistent=self.request.get("ConsistentRead", False))
+        for obj in objs:
+            deferred_load.add(obj, deferred)
 
 
 class ScanIterator(SearchModelIterator):
@@ -482,6 +881,7 @@ class ScanIterator(SearchModelIterator):
     :param index: :class:`~bloop.models.Index` to scan, or None.
     :param dict request: The base request dict for each Scan call.
     :param set projected: Set of :class:`~bloop.models.Column` that should be included in each result.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
     """
     mode = "scan"
 
@@ -496,5 +896,332 @@ class QueryIterator(SearchModelIterator):
     :param index: :class:`~bloop.models.Index` to query, or None.
     :param dict request: The base request dict for each Query call.
     :param set projected: Set of :class:`~bloop.models.Column` that should be included in each result.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
     """
     mode = "query"
+
+
+class HydratingQueryIterator(QueryIterator):
+    """Reusable query iterator that reads keys from an index and loads each object from the table.
+
+    Returned from :func:`Engine.query <bloop.engine.Engine.query>` with ``hydrate=True`` when the index doesn't include
+    the projection.  Each page of keys is loaded with concurrent BatchGetItem calls while the next page of the index is
+    queried.  Objects are yielded in index order.  Any that were deleted from the table before they were loaded are
+    skipped.
+
+    :param engine: :class:`~bloop.engine.Engine` to unpack models with.
+    :param model: :class:`~bloop.models.BaseModel` being queried.
+    :param index: :class:`~bloop.models.Index` to query.
+    :param dict request: The base request dict for each Query call.
+    :param set projected: The model's key columns, which are read from the index.
+    :param int limit: *(Optional)* Maximum number of results to return.  Default is None (no limit).
+    :param bool consistent: *(Optional)* Load from the table with strongly consistent reads.  Default is False.
+    :param int workers: *(Optional)* Maximum number of concurrent BatchGetItem calls.  Default is 4.
+    """
+    def __init__(
+            self, *, engine, model, index, request, projected, limit=None, lazy=False, consistent=False, workers=4):
+        super().__init__(
+            engine=engine, model=model, index=index, request=request, projected=projected, limit=limit, lazy=False)
+        self.consistent = consistent
+        self.workers = workers
+        self._queried = False
+        # One list of load futures for each page, in index order
+        self._pending = collections.deque()
+        self._executor = None
+
+    def reset(self):
+        """Reset to the initial state, clearing the buffer and zeroing count and scanned."""
+        super().reset()
+        self._queried = False
+        self._shutdown()
+
+    def _fetch_page(self):
+        """Queries the next page of keys before waiting on the loads of the oldest page."""
+        # first() and one() only need the first page
+        depth = 2 if self._page_limit is None else 1
+        while not self._queried and len(self._pending) < depth:
+            super()._fetch_page()
+            self._queried = self._exhausted
+        if self._pending:
+            for future in self._pending.popleft():
+                self.buffer.extend(future.result())
+        self._exhausted = self._queried and not self._pending
+        if self._exhausted:
+            self._shutdown()
+
+    def _unpack_page(self, items):
+        """Submits the loads for a page of keys.  Objects are buffered once they're loaded."""
+        if not items:
+            return []
+        if self._codec_columns is not self.projected:
+            self._codec = self.engine._codec(self.model, self.projected)
+            self._codec_columns = self.projected
+        engine, init, codec = self.engine, self.model.Meta.init, self._codec
+        objs = [hydrate(init(), attrs, codec, engine) for attrs in items]
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        self._pending.append([
+            self._executor.submit(self._load, objs[i:i + BATCH_GET_ITEM_CHUNK_SIZE])
+            for i in range(0, len(objs), BATCH_GET_ITEM_CHUNK_SIZE)])
+        return []
+
+    def _load(self, objs):
+        try:
+            self.engine.load(*objs, consistent=self.consistent)
+        except MissingObjects as error:
+            # Deleted from the table after the index was read
+            missing = {id(obj) for obj in error.objects}
+            return [obj for obj in objs if id(obj) not in missing]
+        return objs
+
+    def _shutdown(self):
+        for futures in self._pending:
+            for future in futures:
+                future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class QueryTemplate:
+    """A query that's validated and rendered once, then executed with different parameter values.
+
+    Returned from :func:`Engine.prepare_query <bloop.engine.Engine.prepare_query>`.  Calling the template only dumps
+    the values for each :func:`~bloop.conditions.param` into a copy of the rendered request.
+
+    .. code-block:: python
+
+        by_email = engine.prepare_query(User.by_email, key=User.email == param("email"))
+        for email in emails:
+            user = by_email(email=email).first()
+
+    :param prepared: :class:`~bloop.search.PreparedSearch` whose conditions include
+        :class:`~bloop.conditions.Param` placeholders.
+    """
+    def __init__(self, prepared):
+        self.prepared = prepared
+        values = prepared._request.get("ExpressionAttributeValues", {})
+        # value ref -> Param
+        self.params = {ref: value for ref, value in values.items() if isinstance(value, Param)}
+        self.names = {p.name for p in self.params.values()}
+
+    def __call__(self, **params):
+        """Create a :class:`~bloop.search.QueryIterator` with the given values for each param.
+
+        :raises bloop.exceptions.InvalidCondition: if a param is missing, unknown, or dumps to None.
+        """
+        if params.keys() != self.names:
+            raise InvalidCondition("Expected values for {} but got {}.".format(
+                sorted(self.names), sorted(params)))
+        iterator = iter(self.prepared)
+        if not self.params:
+            return iterator
+
+        values = iterator.request["ExpressionAttributeValues"] = dict(iterator.request["ExpressionAttributeValues"])
+        dump = self.prepared.engine._dump
+        for ref, placeholder in self.params.items():
+            value = dump(placeholder.typedef, params[placeholder.name])
+            if value is None:
+                raise InvalidCondition("{!r} can not be None.".format(placeholder))
+            values[ref] = value
+        return iterator
+
+    def __repr__(self):
+        return search_repr(self.__class__, self.prepared.model, self.prepared.index)
+
+
+class MultiQueryIterator:
+    """Runs one query for each hash key concurrently, yielding the results of every query.
+
+    Returned from :func:`Engine.query_many <bloop.engine.Engine.query_many>`.  Pages are fetched by a bounded pool
+    of threads.  Results are yielded as each page arrives, or merged in range key order when ``ordered`` is True.
+    Once ``limit`` results have been yielded, queued page fetches are cancelled.  Each page is loaded, and its load
+    signals are sent, in the thread that fetched it.
+
+    :param template: :class:`~bloop.search.QueryTemplate` with a ``key`` param for the hash key value.
+    :param keys: Hash key values to query.
+    :param int limit: *(Optional)* Maximum number of results across all queries.  Default is None (no limit).
+    :param bool ordered: *(Optional)* Merge results in range key order.  Default is False.
+    :param int workers: *(Optional)* Maximum number of concurrent queries.  Default is 8.
+    """
+    def __init__(self, *, template, keys, limit=None, ordered=False, workers=8):
+        self.template = template
+        self.model = template.prepared.model
+        self.index = template.prepared.index
+        self.keys = list(keys)
+        self.limit = limit
+        self.ordered = ordered
+        self.workers = workers
+        self._count = 0
+
+    @property
+    def count(self):
+        """Number of results yielded so far."""
+        return self._count
+
+    def __iter__(self):
+        self._count = 0
+        if not self.keys or (self.limit is not None and self.limit <= 0):
+            return
+        iterators = [self.template(key=key) for key in self.keys]
+        pending = set()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(iterators)))
+        try:
+            if self.ordered:
+                results = self._ordered(executor, iterators, pending)
+            else:
+                results = self._unordered(executor, iterators, pending)
+            for result in results:
+                self._count += 1
+                yield result
+                if self.limit is not None and self._count >= self.limit:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _unordered(self, executor, iterators, pending):
+        pending.update(executor.submit(_fetch_page, iterator) for iterator in iterators)
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                iterator = future.result()
+                while iterator.buffer:
+                    yield next(iterator)
+                if not iterator.exhausted:
+                    pending.add(executor.submit(_fetch_page, iterator))
+
+    def _ordered(self, executor, iterators, pending):
+        # Submit the first page of every query before the merge blocks on any of them
+        futures = [executor.submit(_fetch_page, iterator) for iterator in iterators]
+        pending.update(futures)
+        streams = [self._stream(executor, future, pending) for future in futures]
+        range_key = (self.index or self.model.Meta).range_key
+        return heapq.merge(
+            *streams,
+            key=lambda obj: getattr(obj, range_key.model_name),
+            reverse=not self.template.prepared.forward)
+
+    @staticmethod
+    def _stream(executor, future, pending):
+        while True:
+            iterator = future.result()
+            pending.discard(future)
+            while iterator.buffer:
+                yield next(iterator)
+            if iterator.exhausted:
+                return
+            future = executor.submit(_fetch_page, iterator)
+            pending.add(future)
+
+    def __repr__(self):
+        return search_repr(self.__class__, self.model, self.index)
+
+
+def _fetch_page(iterator):
+    iterator._fetch_page()
+    return iterator
+
+
+class SegmentedCount:
+    """Counts the items in a table or index with a ``Select=COUNT`` scan split into segments.
+
+    Returned from :func:`Engine.count <bloop.engine.Engine.count>`.  Segments are scanned concurrently, at most
+    ``workers`` at a time; the totals are available as the scan progresses.
+
+    :param prepared: :class:`~bloop.search.PreparedSearch` for a scan with projection "count".
+    :param int segments: Number of segments to split the scan into.
+    :param int item_count: *(Optional)* The approximate ``ItemCount`` from DescribeTable.  When provided, no segments
+        are scanned and this is the count.  Default is None.
+    :param int workers: Maximum number of segments to scan at once.  Default is 8.
+    """
+    def __init__(self, *, prepared, segments, item_count=None, workers=8):
+        self.model = prepared.model
+        self.index = prepared.index
+        self.approximate = item_count is not None
+        self.workers = workers
+        self._item_count = item_count
+        self._lock = threading.Lock()
+
+        self.iterators = []
+        self._pages = []
+        if self.approximate:
+            return
+        self._pages = [0] * segments
+        for segment in range(segments):
+            iterator = iter(prepared)
+            if segments > 1:
+                iterator.request["Segment"] = segment
+                iterator.request["TotalSegments"] = segments
+            self.iterators.append(iterator)
+
+    @property
+    def segments(self):
+        """Totals for each segment: a list of dicts with "count", "scanned", "pages", and "exhausted"."""
+        return [
+            {"count": iterator._count, "scanned": iterator._scanned, "pages": pages, "exhausted": iterator.exhausted}
+            for iterator, pages in zip(self.iterators, self._pages)
+        ]
+
+    @property
+    def count(self):
+        """Number of matching items counted so far, across all segments."""
+        if self.approximate:
+            return self._item_count
+        return sum(iterator._count for iterator in self.iterators)
+
+    @property
+    def scanned(self):
+        """Number of items that DynamoDB evaluated so far, before any filter was applied."""
+        if self.approximate:
+            return self._item_count
+        return sum(iterator._scanned for iterator in self.iterators)
+
+    @property
+    def pages(self):
+        """Number of pages scanned so far, across all segments."""
+        return sum(self._pages)
+
+    @property
+    def progress(self):
+        """Fraction of segments that have been completely scanned, from 0.0 to 1.0.
+
+        This only moves when a segment finishes.  Use :attr:`pages` or :attr:`scanned` to follow each page.
+        """
+        if not self.iterators:
+            return 1.0
+        return sum(1 for iterator in self.iterators if iterator.exhausted) / len(self.iterators)
+
+    def run(self, callback=None):
+        """Scan every segment concurrently, blocking until all segments are exhausted.
+
+        :param callback: *(Optional)* Called with this SegmentedCount after each page of any segment.
+            Calls are serialized, but may come from any thread.  Default is None.
+        :return: This SegmentedCount, for chaining.
+        """
+        if not self.iterators:
+            return self
+        workers = min(self.workers, len(self.iterators))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._run_segment, segment, iterator, callback)
+                for segment, iterator in enumerate(self.iterators)
+            ]
+            for future in futures:
+                # Re-raise the first exception from any segment
+                future.result()
+        return self
+
+    def _run_segment(self, segment, iterator, callback):
+        while not iterator.exhausted:
+            iterator._fetch_page()
+            with self._lock:
+                self._pages[segment] += 1
+                if callback is not None:
+                    callback(self)
+
+    def __repr__(self):
+        return search_repr(self.__class__, self.model, self.index)
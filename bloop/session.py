@@ -53,23 +53,46 @@ class SessionWrapper:
         """Save an object to DynamoDB.
 
         :param item: Unpacked into kwargs for :func:`boto3.DynamoDB.Client.update_item`.
+        :return: The item's attributes from the response's "Attributes", when "ReturnValues" is set.
+        :rtype: dict
+        :raises bloop.exceptions.ConstraintViolation: if the condition (or atomic) is not met.
+        """
+        try:
+            response = self.dynamodb_client.update_item(**item)
+        except botocore.exceptions.ClientError as error:
+            handle_constraint_violation(error)
+        else:
+            return response.get("Attributes", {})
+
+    def put_item(self, item):
+        """Overwrite an item in DynamoDB.
+
+        :param item: Unpacked into kwargs for :func:`boto3.DynamoDB.Client.put_item`.
+        :return: The item's attributes from the response's "Attributes", when "ReturnValues" is set.
+        :rtype: dict
         :raises bloop.exceptions.ConstraintViolation: if the condition (or atomic) is not met.
         """
         try:
-            self.dynamodb_client.update_item(**item)
+            response = self.dynamodb_client.put_item(**item)
         except botocore.exceptions.ClientError as error:
             handle_constraint_violation(error)
+        else:
+            return response.get("Attributes", {})
 
     def delete_item(self, item):
         """Delete an object in DynamoDB.
 
         :param item: Unpacked into kwargs for :func:`boto3.DynamoDB.Client.delete_item`.
+        :return: The item's attributes from the response's "Attributes", when "ReturnValues" is set.
+        :rtype: dict
         :raises bloop.exceptions.ConstraintViolation: if the condition (or atomic) is not met.
         """
         try:
-            self.dynamodb_client.delete_item(**item)
+            response = self.dynamodb_client.delete_item(**item)
         except botocore.exceptions.ClientError as error:
             handle_constraint_violation(error)
+        else:
+            return response.get("Attributes", {})
 
     def load_items(self, items):
         """Loads any number of items in chunks, handling continuation tokens.
@@ -145,6 +168,18 @@ class SessionWrapper:
         except botocore.exceptions.ClientError as error:
             handle_table_exists(error, model)
 
+    def describe_table(self, table_name):
+        """Wraps :func:`boto3.DynamoDB.Client.describe_table`.
+
+        :param str table_name: Name of the table to describe, usually from the model's ``Meta.table_name``.
+        :return: The table description, including its approximate ``ItemCount``.
+        :rtype: dict
+        """
+        try:
+            return self.dynamodb_client.describe_table(TableName=table_name)["Table"]
+        except botocore.exceptions.ClientError as error:
+            raise BloopException("Unexpected error while describing table.") from error
+
     def validate_table(self, model):
         """Polls until a creating table is ready, then verifies the description against the model's requirements.
 
@@ -160,10 +195,7 @@ class SessionWrapper:
         calls = 0
         while status is not ready:
             calls += 1
-            try:
-                actual = self.dynamodb_client.describe_table(TableName=table_name)["Table"]
-            except botocore.exceptions.ClientError as error:
-                raise BloopException("Unexpected error while describing table.") from error
+            actual = self.describe_table(table_name)
             status = simple_table_status(actual)
         logger.debug("validate_table: table \"{}\" was in ACTIVE state after {} calls".format(table_name, calls))
         expected = expected_table_description(model)
@@ -321,14 +353,15 @@ def standardize_query_response(response):
 def create_batch_get_chunks(items):
     buffer, count = {}, 0
     for table_name, table_attrs in items.items():
-        consistent_read = table_attrs["ConsistentRead"]
+        # ConsistentRead, and any ProjectionExpression and ExpressionAttributeNames
+        options = {key: value for key, value in table_attrs.items() if key != "Keys"}
         for key in table_attrs["Keys"]:
             # New table name?
             table = buffer.get(table_name, None)
             if table is None:
                 # PERF: overhead using setdefault is (n-1)
                 #       for n items in the same table in this chunk
-                table = buffer[table_name] = {"ConsistentRead": consistent_read, "Keys": []}
+                table = buffer[table_name] = dict(options, Keys=[])
 
             table["Keys"].append(key)
             count += 1
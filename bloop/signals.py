@@ -37,6 +37,23 @@ object_loaded.__doc__ = """Sent by ``engine`` after an object is loaded from Dyn
 :param obj: The :class:`~bloop.models.BaseModel` loaded from DynamoDB.
 """
 
+objects_loaded = signal("objects_loaded")
+objects_loaded.__doc__ = """Sent by ``engine`` after a batch of objects is loaded from DynamoDB.
+
+A batch is one page of a query or scan, the objects from one call to :func:`Engine.load <bloop.engine.Engine.load>`,
+or the objects in one stream record.  This is sent even when the engine doesn't send
+:data:`~bloop.signals.object_loaded` for each object.
+
+.. code-block:: python
+
+    @objects_loaded.connect
+    def on_loaded(_, objs, **__):
+        metrics.increment("objects.loaded", len(objs))
+
+:param engine: The :class:`~bloop.engine.Engine` that loaded the objects.
+:param list objs: The :class:`~bloop.models.BaseModel` objects loaded from DynamoDB.
+"""
+
 object_saved = signal("object_saved")
 object_saved.__doc__ = """Sent by ``engine`` after an object is saved to DynamoDB.
 
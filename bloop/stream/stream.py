@@ -1,5 +1,5 @@
-from ..signals import object_loaded
-from ..util import unpack_from_dynamodb
+from ..conditions import hydrate
+from ..signals import object_loaded, objects_loaded
 from .coordinator import Coordinator
 
 
@@ -29,11 +29,16 @@ class Stream:
         record = next(self.coordinator)
         if record:
             meta = self.model.Meta
+            loaded = []
             for key, expected in [("new", meta.columns), ("old", meta.columns), ("key", meta.keys)]:
                 if key not in meta.stream["include"]:
                     record[key] = None
                 else:
                     self._unpack(record, key, expected)
+                    if record[key] is not None:
+                        loaded.append(record[key])
+            if loaded:
+                objects_loaded.send(self.engine, engine=self.engine, objs=loaded)
         return record
 
     def heartbeat(self):
@@ -81,11 +86,7 @@ class Stream:
         attrs = record.get(key)
         if attrs is None:
             return
-        obj = unpack_from_dynamodb(
-            attrs=attrs,
-            expected=expected,
-            model=self.model,
-            engine=self.engine
-        )
-        object_loaded.send(self.engine, engine=self.engine, obj=obj)
+        obj = hydrate(self.model.Meta.init(), attrs, self.engine._codec(self.model, expected), self.engine)
+        if self.engine.object_loaded_signals:
+            object_loaded.send(self.engine, engine=self.engine, obj=obj)
         record[key] = obj
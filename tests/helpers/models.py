@@ -94,6 +94,18 @@ class ProjectedIndexes(BaseModel):
     by_lsi = LocalSecondaryIndex(range_key="r", projection=["both", "lsi_only"])
 
 
+class VersionedModel(BaseModel):
+    id = Column(String, hash_key=True)
+    data = Column(String)
+    version = Column(Integer, version=True)
+
+
+class DeferredModel(BaseModel):
+    id = Column(String, hash_key=True)
+    name = Column(String)
+    body = Column(String, deferred=True)
+
+
 conditions = set()
 
 
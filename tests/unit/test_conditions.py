@@ -17,21 +17,33 @@ from bloop.conditions import (
     InvalidCondition,
     NotCondition,
     OrCondition,
+    Param,
     Proxy,
     Reference,
     ReferenceTracker,
+    RenderCache,
+    _obj_tracking,
+    collection_delta,
     get_marked,
     get_snapshot,
+    hydrate,
     iter_columns,
     iter_conditions,
+    load_lazy,
+    normalize,
+    param,
+    decrement,
+    increment,
     printable_column_name,
     render,
+    set_lazy,
 )
 from bloop.models import BaseModel, Column
-from bloop.signals import object_deleted, object_loaded, object_saved
+from bloop.signals import object_deleted, object_loaded, object_modified, object_saved
 from bloop.types import Binary, Boolean, Integer, List, Map, Set, String
+from bloop.util import missing
 
-from ..helpers.models import Document, User
+from ..helpers.models import Document, User, VectorModel
 
 
 class MockColumn(Column):
@@ -180,6 +192,96 @@ def test_on_loaded_full(engine):
     )
 
 
+def test_hydrate(engine):
+    """Hydration marks every column without object_modified, and snapshots the wire values"""
+    modified = []
+    user = User()
+    attrs = {"age": {"N": "3"}, "name": {"S": "foo"}}
+    codec = engine._codec(User, {User.age, User.name, User.email})
+
+    with object_modified.connected_to(lambda *a, **kw: modified.append(kw)):
+        assert hydrate(user, attrs, codec, engine) is user
+    assert not modified
+
+    assert (user.age, user.name, user.email) == (3, "foo", None)
+    assert get_marked(user) == {User.age, User.email, User.name}
+    snapshot = get_snapshot(user)
+    assert snapshot == (
+        User.age.is_({"N": "3"}) &
+        User.email.is_(None) &
+        User.name.is_({"S": "foo"})
+    )
+
+    # The next object_loaded doesn't sync again; the one after that does
+    values = _obj_tracking[user]["snapshot"]
+    object_loaded.send(engine, engine=engine, obj=user)
+    assert _obj_tracking[user]["snapshot"] is values
+    object_loaded.send(engine, engine=engine, obj=user)
+    assert _obj_tracking[user]["snapshot"] is not values
+    assert get_snapshot(user) == snapshot
+
+
+def test_snapshot_stores_dumped_values(engine):
+    """The snapshot is kept as dumped values, and only built into a condition by get_snapshot"""
+    user = User(age=3, name="foo")
+    object_saved.send(engine, engine=engine, obj=user)
+    assert _obj_tracking[user]["snapshot"] == {User.age: {"N": "3"}, User.name: {"S": "foo"}}
+
+
+def test_atomic_tracking_disabled(engine):
+    """Without atomic tracking, syncs don't store a snapshot and atomic conditions can't be rendered"""
+    class Untracked(BaseModel):
+        class Meta:
+            atomic_tracking = False
+        id = Column(String, hash_key=True)
+        data = Column(String)
+    engine.bind(Untracked)
+
+    obj = Untracked(id="foo", data="bar")
+    object_saved.send(engine, engine=engine, obj=obj)
+    assert _obj_tracking[obj]["snapshot"] is None
+    assert get_marked(obj) == {Untracked.id, Untracked.data}
+
+    with pytest.raises(InvalidCondition):
+        get_snapshot(obj)
+    with pytest.raises(InvalidCondition):
+        render(engine, obj=obj, atomic=True)
+
+
+def test_lazy_load(engine):
+    """Lazy columns are marked, and loaded once on first read"""
+    user = User()
+    set_lazy(user, engine, {"age": {"N": "3"}}, {User.age, User.name})
+    assert get_marked(user) == {User.age, User.name}
+
+    assert user.age == 3
+    assert user.name is None
+    # Loaded values are cached on the object, not loaded again
+    assert load_lazy(user, User.age) is missing
+    assert user.age == 3
+
+
+def test_lazy_sync_uses_raw_values(engine):
+    """Snapshots of lazy columns don't load the column"""
+    user = User()
+    set_lazy(user, engine, {"age": {"N": "3"}}, {User.age, User.name})
+    object_loaded.send(engine, engine=engine, obj=user)
+
+    assert get_snapshot(user) == (
+        User.age.is_({"N": "3"}) &
+        User.name.is_(None)
+    )
+    assert load_lazy(user, User.age) == 3
+
+
+def test_lazy_modified_discards_raw(engine):
+    user = User()
+    set_lazy(user, engine, {"age": {"N": "3"}}, {User.age})
+    user.age = 4
+    assert load_lazy(user, User.age) is missing
+    assert user.age == 4
+
+
 def test_on_modified():
     """When an object's values are set or deleted, those columns are marked for tracking"""
 
@@ -342,6 +444,18 @@ def test_ref_value_path(reference_tracker):
     assert reference_tracker.attr_values == expected_values
 
 
+def test_ref_value_param(reference_tracker):
+    """params aren't dumped, but keep the typedef to dump with later"""
+    column = Document.data["Description"]["Body"]
+    ref, value = reference_tracker._value_ref(column, param("body"))
+
+    assert ref == ":v0"
+    assert isinstance(value, Param)
+    assert value.name == "body"
+    assert value.typedef is Document.data.typedef["Description"]["Body"]
+    assert reference_tracker.attr_values == {":v0": value}
+
+
 def test_ref_value_dumped(reference_tracker):
     """no path, value already dumped"""
     column = Document.id
@@ -540,6 +654,53 @@ def test_render_projection_only(engine):
     }
 
 
+def test_render_cache_hit(engine):
+    """Conditions with the same structure reuse the expression and only dump new values"""
+    for email, age in [("@", 3), ("other@", 4)]:
+        condition = (User.email == email) & User.name.is_(None) & User.age.between(age, 10)
+        rendered = render(engine, filter=condition, projection=[User.id])
+        renderer = ConditionRenderer(engine)
+        renderer.render(filter=condition, projection=[User.id])
+        assert rendered == renderer.rendered
+    assert rendered["ExpressionAttributeValues"] == {":v1": {"S": "other@"}, ":v5": {"N": "4"}, ":v6": {"N": "10"}}
+    assert (engine.render_cache.hits, engine.render_cache.misses) == (1, 1)
+
+
+def test_render_cache_empty_value(engine):
+    """A value that dumps to None falls back to a full render"""
+    render(engine, condition=VectorModel.set_str == {"a"})
+    rendered = render(engine, condition=VectorModel.set_str == set())
+    assert rendered == {
+        "ConditionExpression": "(attribute_not_exists(#n0))",
+        "ExpressionAttributeNames": {"#n0": "set_str"},
+    }
+    assert (engine.render_cache.hits, engine.render_cache.misses) == (0, 2)
+
+
+def test_render_cache_param_not_cached(engine):
+    """Params are bound by a QueryTemplate, so their render isn't cached"""
+    render(engine, key=User.id == param("id"))
+    assert not engine.render_cache
+
+
+def test_render_cache_lru(engine):
+    cache = RenderCache(maxsize=2)
+    for condition in [User.age == 3, User.name == "foo", User.age == 4, User.email == "@"]:
+        cache.render(engine, condition=condition)
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+def test_render_cache_disabled(engine):
+    cache = RenderCache(maxsize=0)
+    cache.render(engine, condition=User.age == 3)
+    cache.render(engine, condition=User.age == 3)
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 2)
+
+
 def test_render_atomic_only_new(engine):
     """Atomic condition on a new object only -> all attribute_not_exists"""
     rendered = render(engine, obj=User(), atomic=True)
@@ -685,6 +846,137 @@ def test_render_update_set_only(renderer):
     }
 
 
+def test_render_update_lazy(renderer, engine):
+    """Unread lazy columns render their raw values"""
+    user = User(id="user_id")
+    set_lazy(user, engine, {"age": {"N": "3"}}, {User.age, User.email})
+    renderer.render_update_expression(user)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "age", "#n2": "email"},
+        "ExpressionAttributeValues": {":v1": {"N": "3"}},
+        "UpdateExpression": "SET #n0=:v1 REMOVE #n2",
+    }
+    assert load_lazy(user, User.age) == 3
+
+
+def test_render_update_increment(renderer):
+    """Increments render as ADD and replace the column's local value"""
+    user = User(id="user_id", age=3, email="@")
+    renderer.render_update_expression(user, updates={User.age: decrement(2)})
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "email", "#n2": "age"},
+        "ExpressionAttributeValues": {":v1": {"S": "@"}, ":v3": {"N": "-2"}},
+        "UpdateExpression": "SET #n0=:v1 ADD #n2 :v3",
+    }
+
+
+@pytest.mark.parametrize("column", [User.id, User.email])
+def test_render_update_invalid_increment(renderer, column):
+    """Keys and non-numeric columns can't be incremented"""
+    user = User(id="user_id")
+    with pytest.raises(InvalidCondition):
+        renderer.render_update_expression(user, updates={column: increment(1)})
+
+
+def test_render_update_unknown_operation(renderer):
+    user = User(id="user_id")
+    with pytest.raises(InvalidCondition):
+        renderer.render_update_expression(user, updates={User.age: 3})
+
+
+@pytest.mark.parametrize("previous, current, expected", [
+    ({"SS": ["a", "b"]}, {"SS": ["b", "a"]}, ("unchanged", None)),
+    ({"SS": ["a"]}, {"SS": ["a", "b"]}, ("add", {"SS": ["b"]})),
+    ({"NS": ["1", "2"]}, {"NS": ["2"]}, ("delete", {"NS": ["1"]})),
+    ({"SS": ["a"]}, {"SS": ["b"]}, None),
+    ({"SS": ["a"]}, None, None),
+    ({"L": [{"S": "a"}]}, {"L": [{"S": "a"}]}, ("unchanged", None)),
+    ({"L": [{"S": "a"}]}, {"L": [{"S": "a"}, {"S": "b"}]}, ("append", {"L": [{"S": "b"}]})),
+    ({"L": [{"S": "a"}]}, {"L": [{"S": "b"}, {"S": "a"}]}, None),
+    ({"L": [{"S": "a"}, {"S": "b"}]}, {"L": [{"S": "a"}]}, None),
+    ({"M": {"a": {"S": "a"}}}, {"M": {"a": {"S": "a"}}}, ("unchanged", None)),
+    (
+        {"M": {"a": {"S": "a"}, "b": {"M": {"c": {"N": "1"}, "d": {"N": "2"}}}, "e": {"S": "e"}}},
+        {"M": {"a": {"S": "a"}, "b": {"M": {"c": {"N": "3"}, "d": {"N": "2"}}}, "f": {"M": {"g": {"N": "4"}}}}},
+        ("paths", [(("b", "c"), {"N": "3"}), (("e",), None), (("f",), {"M": {"g": {"N": "4"}}})])
+    ),
+])
+def test_collection_delta(previous, current, expected):
+    assert collection_delta(previous, current) == expected
+
+
+def test_render_update_set_delta(renderer, engine):
+    """Only the values added to a synced set are sent"""
+    obj = VectorModel(name="foo", set_str={"a", "b"})
+    object_saved.send(engine, engine=engine, obj=obj)
+    obj.set_str.add("c")
+    renderer.render_update_expression(obj)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "set_str"},
+        "ExpressionAttributeValues": {":v1": {"SS": ["c"]}},
+        "UpdateExpression": "ADD #n0 :v1",
+    }
+
+
+def test_render_update_set_delete(renderer, engine):
+    obj = VectorModel(name="foo", set_str={"a", "b"})
+    object_saved.send(engine, engine=engine, obj=obj)
+    obj.set_str.remove("a")
+    renderer.render_update_expression(obj)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "set_str"},
+        "ExpressionAttributeValues": {":v1": {"SS": ["a"]}},
+        "UpdateExpression": "DELETE #n0 :v1",
+    }
+
+
+def test_render_update_list_append(renderer, engine):
+    obj = VectorModel(name="foo", list_str=["a"])
+    object_saved.send(engine, engine=engine, obj=obj)
+    obj.list_str.append("b")
+    renderer.render_update_expression(obj)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "list_str"},
+        "ExpressionAttributeValues": {":v1": {"L": [{"S": "b"}]}},
+        "UpdateExpression": "SET #n0=list_append(#n0, :v1)",
+    }
+
+
+def test_render_update_map_paths(renderer, engine):
+    """Only the nested paths of a synced map that changed are sent"""
+    document = Document(id=3, data={"Rating": 4, "Description": {"Heading": "h", "Body": "b"}})
+    object_saved.send(engine, engine=engine, obj=document)
+    document.data["Description"]["Body"] = "new body"
+    del document.data["Rating"]
+    renderer.render_update_expression(document)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "data", "#n1": "Description", "#n2": "Body", "#n4": "Rating"},
+        "ExpressionAttributeValues": {":v3": {"S": "new body"}},
+        "UpdateExpression": "SET #n0.#n1.#n2=:v3 REMOVE #n0.#n4",
+    }
+
+
+def test_render_update_collection_unchanged(renderer, engine):
+    """Synced collections without changes aren't sent"""
+    obj = VectorModel(name="foo", set_str={"a"}, list_str=["a"])
+    object_saved.send(engine, engine=engine, obj=obj)
+    renderer.render_update_expression(obj)
+    assert not renderer.rendered
+
+
+def test_render_update_collection_replaced(renderer, engine):
+    """A list that isn't appended to is sent in full"""
+    obj = VectorModel(name="foo", list_str=["a", "b"])
+    object_saved.send(engine, engine=engine, obj=obj)
+    obj.list_str = ["b"]
+    renderer.render_update_expression(obj)
+    assert renderer.rendered == {
+        "ExpressionAttributeNames": {"#n0": "list_str"},
+        "ExpressionAttributeValues": {":v1": {"L": [{"S": "b"}]}},
+        "UpdateExpression": "SET #n0=:v1",
+    }
+
+
 def test_render_update_remove_only(renderer):
     """Only updates were del'd values, values set to None, or values that render as None"""
     document = Document()
@@ -1306,6 +1598,154 @@ def test_render_and_or_simplify(condition_cls, renderer):
     }
 
 
+@pytest.mark.parametrize("condition, expected", [
+    # flatten, merge into in_
+    ((User.age == 3) | ((User.age == 4) | User.name.is_(None)) | Condition(),
+     OrCondition(User.age.in_(3, 4), User.name.is_(None))),
+    ((User.age == 3) | User.age.in_(4, 5), User.age.in_(3, 4, 5)),
+    # duplicates and empty conditions
+    (AndCondition(AndCondition(User.age == 3, User.name == "foo"), Condition(), User.age == 3),
+     AndCondition(User.age == 3, User.name == "foo")),
+    (AndCondition(Condition(), User.age == 3), User.age == 3),
+    (OrCondition(Condition(), AndCondition()), Condition()),
+    (NotCondition(OrCondition(User.age == 3, User.age == 3)), NotCondition(User.age == 3)),
+    # merge into between
+    ((User.age >= 3) & (User.name == "foo") & (User.age <= 10),
+     AndCondition(User.age.between(3, 10), User.name == "foo")),
+    # not merged
+    ((User.age >= 3) & (User.age >= 4) & (User.age <= 10),
+     AndCondition(User.age >= 3, User.age >= 4, User.age <= 10)),
+    ((User.age >= 5) & (User.age <= 3), AndCondition(User.age >= 5, User.age <= 3)),
+    ((User.name >= "b") & (User.name <= 3), AndCondition(User.name >= "b", User.name <= 3)),
+    ((User.age == 3) | User.age.is_(None), OrCondition(User.age == 3, User.age.is_(None))),
+    ((User.age == 3) & (User.age == 4), AndCondition(User.age == 3, User.age == 4)),
+    (AndCondition(), AndCondition()),
+    (None, None)
+])
+def test_normalize(condition, expected):
+    assert normalize(condition) == expected
+
+
+def test_normalize_not_modified():
+    """Normal conditions are left alone, and nested conditions are rebuilt instead of modified"""
+    condition = (User.age >= 3) & (User.name == "foo")
+    assert normalize(condition) == condition
+
+    inner = OrCondition(User.age == 4, User.age == 5)
+    nested = OrCondition(User.age == 3, inner)
+    assert normalize(nested) == User.age.in_(3, 4, 5)
+    assert len(inner.values) == 2
+    assert len(nested.values) == 2
+
+
+def test_normalize_in_limit():
+    """A merge that would exceed DynamoDB's 100 value limit for IN isn't made"""
+    condition = OrCondition(*(User.age == i for i in range(101)))
+    assert normalize(condition) == condition
+
+
+def test_normalize_large_duplicates():
+    """Duplicates are dropped from large conditions, including clauses with unhashable values"""
+    clauses = [User.age == i for i in range(150)] + [User.age == i for i in range(0, 150, 3)]
+    condition = OrCondition(*clauses)
+    assert normalize(condition) == OrCondition(*clauses[:150])
+
+    bounds = [User.age != i for i in range(200)]
+    documents = [Document.numbers == [i] for i in range(50)]
+    condition = AndCondition(*bounds, *documents, *reversed(bounds), *documents)
+    assert normalize(condition) == AndCondition(*bounds, *documents)
+
+
+def test_render_normalized(engine):
+    condition = (User.age == 3) | (User.age == 4) | (User.age == 3)
+    assert render(engine, condition=condition) == {
+        "ConditionExpression": "(#n2 IN (:v0, :v1))",
+        "ExpressionAttributeNames": {"#n2": "age"},
+        "ExpressionAttributeValues": {":v0": {"N": "3"}, ":v1": {"N": "4"}},
+    }
+
+
+user_attrs = {"id": {"S": "u"}, "age": {"N": "30"}, "email": {"S": "a@b"}}
+document_attrs = {
+    "data": {"M": {"Description": {"M": {"Heading": {"S": "Title"}}}, "Rating": {"N": "4.5"}}},
+    "numbers": {"L": [{"N": "1"}, {"N": "2"}]},
+    "nested_numbers": {"L": [{"L": [{"N": "1"}, {"N": "2"}]}]},
+    "value": {"N": "3.00"},
+}
+vector_attrs = {"set_str": {"SS": ["a", "b"]}}
+
+
+@pytest.mark.parametrize("condition, attrs, expected", [
+    (Condition(), user_attrs, True),
+    (User.age == 30, user_attrs, True),
+    (User.age != 30, user_attrs, False),
+    (User.name.is_(None), user_attrs, True),
+    (User.name.is_not(None), user_attrs, False),
+    (User.name != "foo", user_attrs, True),
+    (User.name < "z", user_attrs, False),
+    (User.age < 31, user_attrs, True),
+    (User.age > 30, user_attrs, False),
+    (User.age <= 30, user_attrs, True),
+    (User.age >= 31, user_attrs, False),
+    (User.age.between(18, 30), user_attrs, True),
+    (User.email.begins_with("a@"), user_attrs, True),
+    (User.email.contains("@"), user_attrs, True),
+    (User.age.in_(1, 30), user_attrs, True),
+    (User.age.in_(1, 2), user_attrs, False),
+    (User.email == User.id, user_attrs, False),
+    (User.id == User.id, user_attrs, True),
+    ((User.age == 30) & (User.name == "foo"), user_attrs, False),
+    ((User.age == 30) | (User.name == "foo"), user_attrs, True),
+    (~(User.age == 30), user_attrs, False),
+
+    # Numbers compare by value
+    (Document.value == 3, document_attrs, True),
+    (Document.data["Rating"] > 4, document_attrs, True),
+    (Document.data["Description"]["Heading"].begins_with("Ti"), document_attrs, True),
+    (Document.data["Description"]["Body"].is_(None), document_attrs, True),
+    (Document.numbers[1] == 2, document_attrs, True),
+    (Document.numbers[5].is_(None), document_attrs, True),
+    (Document.numbers.contains(2), document_attrs, True),
+    (Document.numbers.contains(3), document_attrs, False),
+    (Document.nested_numbers.contains([1, 2]), document_attrs, True),
+    (Document.some_string.contains("a"), document_attrs, False),
+
+    # Sets are unordered
+    (VectorModel.set_str == {"b", "a"}, vector_attrs, True),
+    (VectorModel.set_str.contains("a"), vector_attrs, True),
+    (VectorModel.set_str.contains("c"), vector_attrs, False),
+])
+def test_evaluate_attrs(condition, attrs, expected):
+    assert condition.evaluate(attrs) is expected
+
+
+def test_evaluate_object():
+    user = User(id="u", age=30, email="a@b")
+    assert (User.age >= 18).evaluate(user)
+    assert User.name.is_(None).evaluate(user)
+    assert not User.email.begins_with("admin").evaluate(user)
+
+
+def test_compile():
+    """A compiled condition can be called for many objects"""
+    is_adult = (User.age >= 18).compile()
+    users = [User(id=str(age), age=age) for age in [3, 20, 40]] + [User(id="unknown")]
+    assert [user.id for user in users if is_adult(user)] == ["20", "40"]
+
+
+@pytest.mark.parametrize("condition", [
+    User.age < None,
+    User.age.between(3, None),
+    User.age.in_(),
+    User.age == param("age"),
+    AndCondition(),
+    OrCondition()
+])
+def test_compile_invalid(condition):
+    with pytest.raises(InvalidCondition):
+        condition.compile()
+
+
 # END CONDITIONS ====================================================================================== END CONDITIONS
 
 
@@ -1,25 +1,33 @@
 import datetime
 import logging
+import uuid
 from unittest.mock import Mock
 
 import pytest
 
-from bloop.engine import Engine, dump_key
+from bloop.conditions import get_snapshot, increment, param
+from bloop.engine import Engine, dump_item, dump_key
 from bloop.exceptions import (
+    ConstraintViolation,
+    InvalidCondition,
+    InvalidFilterCondition,
+    InvalidKeyCondition,
     InvalidModel,
     InvalidStream,
     MissingKey,
     MissingObjects,
+    TableMismatch,
     UnboundModel,
     UnknownType,
 )
 from bloop.models import BaseModel, Column, GlobalSecondaryIndex
+from bloop.search import QueryIterator, ScanIterator
 from bloop.session import SessionWrapper
-from bloop.signals import object_saved
+from bloop.signals import object_loaded, object_saved, objects_loaded
 from bloop.types import DateTime, Integer, String
 from bloop.util import ordered
 
-from ..helpers.models import ComplexModel, User, VectorModel
+from ..helpers.models import ComplexModel, DeferredModel, User, VectorModel, VersionedModel
 
 
 def test_missing_objects(engine, session, caplog):
@@ -78,6 +86,67 @@ def test_load_object(engine, session):
     assert user.id == user_id
 
 
+def test_load_batch_signal(engine, session):
+    """Without per-object signals, objects_loaded is still sent and the snapshot is still built"""
+    engine.object_loaded_signals = False
+    session.load_items.return_value = {"User": [{"age": {"N": "5"}, "id": {"S": "user_id"}}]}
+    user = User(id="user_id")
+
+    single, batches = [], []
+    with object_loaded.connected_to(lambda _, obj, **__: single.append(obj)), \
+            objects_loaded.connected_to(lambda _, objs, **__: batches.append(objs)):
+        engine.load(user)
+
+    assert not single
+    assert batches == [[user]]
+    assert user.age == 5
+    assert get_snapshot(user) == (
+        User.age.is_({"N": "5"}) &
+        User.email.is_(None) &
+        User.id.is_({"S": "user_id"}) &
+        User.joined.is_(None) &
+        User.name.is_(None)
+    )
+
+
+def test_load_deferred(engine, session):
+    """Deferred columns aren't loaded until one is read, then they're loaded for the whole load in one call"""
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        table = request["DeferredModel"]
+        names = set(table["ExpressionAttributeNames"].values())
+        items = []
+        for key in table["Keys"]:
+            item = {"id": key["id"], "name": {"S": "name"}, "body": {"S": "body-" + key["id"]["S"]}}
+            items.append({name: value for name, value in item.items() if name in names})
+        return {"DeferredModel": items}
+    session.load_items.side_effect = respond
+
+    first, second, local = DeferredModel(id="a"), DeferredModel(id="b"), DeferredModel(id="c", body="local")
+    engine.load(first, second, local)
+    assert len(requests) == 1
+    assert set(requests[0]["DeferredModel"]["ExpressionAttributeNames"].values()) == {"id", "name"}
+    assert first.name == "name"
+    # Rendering an object doesn't load its deferred columns
+    repr(first)
+    assert len(requests) == 1
+
+    assert first.body == "body-a"
+    assert len(requests) == 2
+    assert set(requests[1]["DeferredModel"]["ExpressionAttributeNames"].values()) == {"id", "body"}
+    assert sorted(key["id"]["S"] for key in requests[1]["DeferredModel"]["Keys"]) == ["a", "b"]
+    assert second.body == "body-b"
+    assert local.body == "local"
+    assert len(requests) == 2
+    assert get_snapshot(first) == (
+        DeferredModel.body.is_({"S": "body-a"}) &
+        DeferredModel.id.is_({"S": "a"}) &
+        DeferredModel.name.is_({"S": "name"})
+    )
+
+
 def test_load_objects(engine, session):
     user1 = User(id="user1")
     user2 = User(id="user2")
@@ -286,6 +355,26 @@ def test_load_dump_unknown(engine):
         engine._dump(NotModeled, obj)
 
 
+def test_codec_cached(engine):
+    """Codecs are built at bind time for the model and each index, and reused for the same columns"""
+    codec = engine._codec(User, User.Meta.columns)
+    assert engine._codec(User, list(User.Meta.columns)) is codec
+    assert (User, frozenset(User.by_email.projection["included"])) in engine._codecs
+
+    assert [entry[:2] for entry in codec.load] == [
+        ("age", "age"), ("email", "email"), ("id", "id"), ("j", "joined"), ("name", "name")]
+    dynamo_name, model_name, dump = codec.dump[0]
+    assert dump(3, context=engine._context) == {"N": "3"}
+
+
+def test_codec_unbound(engine):
+    class Model(BaseModel):
+        id = Column(Integer, hash_key=True)
+
+    with pytest.raises(UnboundModel):
+        engine._codec(Model, Model.Meta.columns)
+
+
 def test_load_missing_key(engine):
     """Trying to load objects with missing hash and range keys raises"""
     user = User(age=2)
@@ -388,6 +477,147 @@ def test_save_atomic_condition(engine, session):
     session.save_item.assert_called_once_with(expected)
 
 
+def test_save_version_new(engine, session):
+    """A new object expects no version and starts at 1"""
+    obj = VersionedModel(id="foo", data="bar")
+    expected = {
+        "ConditionExpression": "(attribute_not_exists(#n0))",
+        "ExpressionAttributeNames": {"#n0": "version", "#n2": "data"},
+        "ExpressionAttributeValues": {":v3": {"S": "bar"}, ":v4": {"N": "1"}},
+        "Key": {"id": {"S": "foo"}},
+        "TableName": "VersionedModel",
+        "UpdateExpression": "SET #n2=:v3, #n0=:v4"}
+    engine.save(obj)
+    session.save_item.assert_called_once_with(expected)
+    assert obj.version == 1
+
+
+def test_save_version_increments(engine, session):
+    """The save expects the local version and increments it in DynamoDB and locally"""
+    obj = VersionedModel(id="foo", version=3)
+    expected = {
+        "ConditionExpression": "(#n0 = :v1)",
+        "ExpressionAttributeNames": {"#n0": "version"},
+        "ExpressionAttributeValues": {":v1": {"N": "3"}, ":v2": {"N": "1"}},
+        "Key": {"id": {"S": "foo"}},
+        "TableName": "VersionedModel",
+        "UpdateExpression": "SET #n0=#n0+:v2"}
+    engine.save(obj)
+    session.save_item.assert_called_once_with(expected)
+    assert obj.version == 4
+
+
+def test_save_version_failed(engine, session):
+    """The local version doesn't change when the save fails"""
+    obj = VersionedModel(id="foo", version=3)
+    session.save_item.side_effect = ConstraintViolation("failed")
+    with pytest.raises(ConstraintViolation):
+        engine.save(obj)
+    assert obj.version == 3
+
+
+def test_save_increment(engine, session):
+    """Increments are sent without reading the column, and the new value is loaded from the response"""
+    user = User(id="user_id")
+    session.save_item.return_value = {"age": {"N": "7"}}
+    expected = {
+        "ExpressionAttributeNames": {"#n0": "age"},
+        "ExpressionAttributeValues": {":v1": {"N": "2"}},
+        "Key": {"id": {"S": "user_id"}},
+        "ReturnValues": "UPDATED_NEW",
+        "TableName": "User",
+        "UpdateExpression": "ADD #n0 :v1"}
+    engine.save(user, updates={User.age: increment(2)})
+    session.save_item.assert_called_once_with(expected)
+    assert user.age == 7
+    # The new value is part of the next atomic condition
+    assert get_snapshot(user) == (User.age.is_({"N": "7"}) & User.id.is_({"S": "user_id"}))
+
+
+def test_save_return_all_new(engine, session):
+    """New values are loaded into the object, and no other instance is returned"""
+    user = User(id="user_id", age=3, email="@")
+    session.save_item.return_value = {"id": {"S": "user_id"}, "age": {"N": "4"}, "name": {"S": "foo"}}
+    assert engine.save(user, return_values="all_new") is None
+    assert session.save_item.call_args[0][0]["ReturnValues"] == "ALL_NEW"
+    assert (user.age, user.name, user.email) == (4, "foo", None)
+
+
+def test_save_return_updated_new(engine, session):
+    """Only the returned columns are loaded"""
+    user = User(id="user_id", age=3, email="@")
+    session.save_item.return_value = {"age": {"N": "4"}}
+    engine.save(user, return_values="updated_new")
+    assert session.save_item.call_args[0][0]["ReturnValues"] == "UPDATED_NEW"
+    assert (user.age, user.email) == (4, "@")
+
+
+def test_save_return_all_old(engine, session):
+    user = User(id="user_id", age=3)
+    session.save_item.return_value = {"id": {"S": "user_id"}, "age": {"N": "2"}}
+    old = engine.save(user, return_values="all_old")
+    assert old[user].age == 2
+    assert user.age == 3
+
+
+def test_save_return_new_version(engine, session):
+    """The returned version isn't incremented again"""
+    obj = VersionedModel(id="foo", version=3)
+    session.save_item.return_value = {"version": {"N": "4"}}
+    engine.save(obj, return_values="updated_new")
+    assert obj.version == 4
+
+
+def test_save_return_values_invalid(engine, session):
+    with pytest.raises(ValueError):
+        engine.save(User(id="user_id"), return_values="updated_old")
+    session.save_item.assert_not_called()
+
+
+def test_dump_item(engine):
+    user = User(id="user_id", age=3, email=None)
+    assert dump_item(engine, user) == {"id": {"S": "user_id"}, "age": {"N": "3"}}
+
+    with pytest.raises(MissingKey):
+        dump_item(engine, User(age=3))
+
+
+def test_save_put(engine, session):
+    """A put writes every column with a value as the Item"""
+    user = User(id="user_id", age=3, email="@")
+    engine.save(user, condition=User.id.is_(None), mode="put")
+    session.put_item.assert_called_once_with({
+        "ConditionExpression": "(attribute_not_exists(#n0))",
+        "ExpressionAttributeNames": {"#n0": "id"},
+        "Item": {"id": {"S": "user_id"}, "age": {"N": "3"}, "email": {"S": "@"}},
+        "TableName": "User"})
+    session.save_item.assert_not_called()
+
+
+def test_save_put_version(engine, session):
+    obj = VersionedModel(id="foo", version=3)
+    engine.save(obj, mode="put")
+    session.put_item.assert_called_once_with({
+        "ConditionExpression": "(#n0 = :v1)",
+        "ExpressionAttributeNames": {"#n0": "version"},
+        "ExpressionAttributeValues": {":v1": {"N": "3"}},
+        "Item": {"id": {"S": "foo"}, "version": {"N": "4"}},
+        "TableName": "VersionedModel"})
+    assert obj.version == 4
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"mode": "replace"},
+    {"mode": "put", "updates": {User.age: increment(1)}},
+    {"mode": "put", "return_values": "all_new"},
+])
+def test_save_invalid_mode(engine, session, kwargs):
+    with pytest.raises(ValueError):
+        engine.save(User(id="user_id"), **kwargs)
+    session.put_item.assert_not_called()
+    session.save_item.assert_not_called()
+
+
 def test_save_condition_key_only(engine, session):
     """Even when the diff is empty, an UpdateItem should be issued
     (in case this is really a create - the item doesn't exist yet)
@@ -452,6 +682,42 @@ def test_delete_multiple_condition(engine, session, caplog):
     assert caplog.record_tuples[-1] == ("bloop.engine", logging.INFO, "successfully deleted 3 objects")
 
 
+def test_delete_version(engine, session):
+    obj = VersionedModel(id="foo", version=3)
+    expected = {
+        "ConditionExpression": "(#n0 = :v1)",
+        "ExpressionAttributeNames": {"#n0": "version"},
+        "ExpressionAttributeValues": {":v1": {"N": "3"}},
+        "Key": {"id": {"S": "foo"}},
+        "TableName": "VersionedModel"}
+    engine.delete(obj)
+    session.delete_item.assert_called_once_with(expected)
+
+
+def test_delete_return_all_old(engine, session):
+    """The old item is loaded into a new instance"""
+    user = User(id="user_id")
+    session.delete_item.return_value = {"id": {"S": "user_id"}, "age": {"N": "3"}}
+    old = engine.delete(user, return_values="all_old")
+    assert session.delete_item.call_args[0][0]["ReturnValues"] == "ALL_OLD"
+    assert old[user] is not user
+    assert old[user].age == 3
+    assert not hasattr(user, "age")
+
+
+def test_delete_return_all_old_missing(engine, session):
+    user = User(id="user_id")
+    session.delete_item.return_value = {}
+    assert engine.delete(user, return_values="all_old") == {user: None}
+
+
+@pytest.mark.parametrize("return_values", ["all_new", "updated_new", "ALL_OLD"])
+def test_delete_return_values_invalid(engine, session, return_values):
+    with pytest.raises(ValueError):
+        engine.delete(User(id="user_id"), return_values=return_values)
+    session.delete_item.assert_not_called()
+
+
 def test_delete_atomic(engine, session):
     user = User(id="user_id")
 
@@ -528,6 +794,107 @@ def test_query(engine):
     model_query = engine.query(User, key=User.Meta.hash_key == "other")
     assert model_query.model is User
     assert model_query.index is None
+    assert model_query.limit is None
+
+    limited_query = engine.query(User, key=User.Meta.hash_key == "other", limit=3)
+    assert limited_query.limit == 3
+
+
+def test_query_lazy_hydrate(engine):
+    with pytest.raises(ValueError):
+        engine.query(User.by_email, key=User.email == "a@b", lazy=True, hydrate=True)
+
+
+def test_find(engine):
+    """Engine.find queries the index with a hash key condition, and explains why"""
+    adults = engine.find(User, (User.email == "a@b") & (User.age >= 18), limit=3)
+    assert isinstance(adults, QueryIterator)
+    assert (adults.index, adults.limit) == (User.by_email, 3)
+    assert adults.explain() == "\n".join([
+        "Query User.by_email",
+        "    key: (User.email == 'a@b')",
+        "    filter: (User.age >= 18)",
+        "    reason: hash key condition on User.by_email",
+    ])
+
+    everyone = engine.find(User, User.age >= 18)
+    assert isinstance(everyone, ScanIterator)
+    assert everyone.index is None
+
+
+def test_prepare_query(engine, session):
+    """Each call to a template dumps new values into a copy of the rendered request"""
+    session.search_items.return_value = {"Count": 0, "ScannedCount": 0, "Items": []}
+    template = engine.prepare_query(
+        User.by_email, key=User.email == param("email"), filter=User.age > param("age"), limit=2)
+
+    first = template(email="a@domain", age=3)
+    second = template(email="b@domain", age=4)
+    assert first.limit == second.limit == 2
+    assert sorted(first.request["ExpressionAttributeValues"].values(), key=str) == [{"N": "3"}, {"S": "a@domain"}]
+    assert sorted(second.request["ExpressionAttributeValues"].values(), key=str) == [{"N": "4"}, {"S": "b@domain"}]
+    # The template's request still holds the placeholders
+    assert len(template.params) == 2
+
+    list(first)
+    mode, request = session.search_items.call_args[0]
+    assert mode == "query"
+    assert request["IndexName"] == "by_email"
+    assert {"N": "3"} in request["ExpressionAttributeValues"].values()
+
+
+@pytest.mark.parametrize("params", [{}, {"email": "a@domain", "other": 1}, {"email": None}])
+def test_prepare_query_invalid_params(engine, params):
+    template = engine.prepare_query(User.by_email, key=User.email == param("email"))
+    with pytest.raises(InvalidCondition):
+        template(**params)
+
+
+@pytest.fixture
+def many_keys(session):
+    """Each ComplexModel partition has two pages with dates like "1a", "3a" for the first key"""
+    keys = [uuid.uuid4() for _ in range(3)]
+    pages = {
+        str(key): [[str(i + 1) + suffix], [str(i + 4) + suffix]]
+        for i, (key, suffix) in enumerate(zip(keys, "abc"))}
+
+    def search_items(mode, request):
+        key = next(v["S"] for v in request["ExpressionAttributeValues"].values() if v["S"] in pages)
+        page = 1 if request.get("ExclusiveStartKey") else 0
+        items = [{"name": {"S": key}, "date": {"S": date}} for date in pages[key][page]]
+        response = {"Count": len(items), "ScannedCount": len(items), "Items": items}
+        if not page:
+            response["LastEvaluatedKey"] = {"date": items[-1]["date"]}
+        return response
+    session.search_items.side_effect = search_items
+    return keys
+
+
+def test_query_many_unordered(engine, session, many_keys):
+    results = list(engine.query_many(ComplexModel, keys=many_keys, range=ComplexModel.date > "0", workers=2))
+    assert sorted(obj.date for obj in results) == ["1a", "2b", "3c", "4a", "5b", "6c"]
+    assert session.search_items.call_count == 6
+    for call in session.search_items.call_args_list:
+        assert call[0][0] == "query"
+
+
+def test_query_many_ordered(engine, session, many_keys):
+    results = engine.query_many(ComplexModel, keys=many_keys, ordered_by_range=True)
+    assert [obj.date for obj in results] == ["1a", "2b", "3c", "4a", "5b", "6c"]
+    assert results.count == 6
+
+
+def test_query_many_limit(engine, session, many_keys):
+    results = engine.query_many(ComplexModel, keys=many_keys, ordered_by_range=True, limit=2)
+    assert [obj.date for obj in results] == ["1a", "2b"]
+    # Each query also sends the overall limit
+    for call in session.search_items.call_args_list:
+        assert call[0][1]["Limit"] <= 2
+
+
+def test_query_many_no_range_key(engine):
+    with pytest.raises(InvalidKeyCondition):
+        engine.query_many(User, keys=["a", "b"], ordered_by_range=True)
 
 
 def test_scan(engine):
@@ -539,6 +906,81 @@ def test_scan(engine):
     model_scan = engine.scan(User)
     assert model_scan.model is User
     assert model_scan.index is None
+    assert model_scan.limit is None
+
+    limited_scan = engine.scan(User, limit=3)
+    assert limited_scan.limit == 3
+
+
+def test_scan_auto_projection(engine, session):
+    """Scans from the same call site project the columns read from earlier results, and load any others"""
+    requests = []
+
+    def respond(mode, request):
+        requests.append(request)
+        return {"Count": 2, "ScannedCount": 2, "Items": [
+            {"id": {"S": "a"}, "age": {"N": "3"}}, {"id": {"S": "b"}, "age": {"N": "4"}}]}
+    session.search_items.side_effect = respond
+    session.load_items.return_value = {"User": [
+        {"id": {"S": "a"}, "email": {"S": "a@domain"}}, {"id": {"S": "b"}, "email": {"S": "b@domain"}}]}
+
+    results = []
+    for _ in range(3):
+        results.append(list(engine.scan(User, projection="auto")))
+        assert [user.age for user in results[-1]] == [3, 4]
+    profile, = engine.access_profiles.values()
+    assert profile.executions == 3
+    assert profile.suggest() == ["age", "id"]
+    projected = [set(request["ExpressionAttributeNames"].values()) for request in requests]
+    assert projected == [{"age", "email", "id", "j", "name"}, {"age", "id"}, {"age", "id"}]
+
+    # A column outside the profile's projection is loaded for the whole page, and projected from then on
+    assert results[-1][0].email == "a@domain"
+    assert results[-1][1].email == "b@domain"
+    assert session.load_items.call_count == 1
+    assert profile.suggest() == ["age", "email", "id"]
+
+
+def test_count(engine, session):
+    """Engine.count scans each segment with Select=COUNT"""
+    session.search_items.return_value = {"Count": 2, "ScannedCount": 3}
+    count = engine.count(User.by_email, filter=User.age > 3, segments=2)
+
+    assert count.index is User.by_email
+    assert count.count == 4
+    assert count.scanned == 6
+    assert session.search_items.call_count == 2
+    for call in session.search_items.call_args_list:
+        mode, request = call[0]
+        assert mode == "scan"
+        assert request["Select"] == "COUNT"
+        assert request["IndexName"] == "by_email"
+        assert "FilterExpression" in request
+
+
+def test_count_approximate(engine, session):
+    """The approximate count comes from DescribeTable's ItemCount for the table or index"""
+    session.describe_table.return_value = {
+        "ItemCount": 7,
+        "GlobalSecondaryIndexes": [{"IndexName": "by_email", "ItemCount": 3}]
+    }
+    assert engine.count(User, exact=False).count == 7
+    assert engine.count(User.by_email, exact=False).count == 3
+    session.describe_table.assert_called_with("User")
+    session.search_items.assert_not_called()
+
+
+def test_count_approximate_missing_index(engine, session):
+    """DescribeTable without the index can't provide its ItemCount"""
+    session.describe_table.return_value = {"ItemCount": 7}
+    with pytest.raises(TableMismatch):
+        engine.count(User.by_email, exact=False)
+
+
+def test_count_approximate_filter(engine, session):
+    with pytest.raises(InvalidFilterCondition):
+        engine.count(User, filter=User.age > 3, exact=False)
+    session.describe_table.assert_not_called()
 
 
 def test_stream(engine, session):
@@ -561,6 +1003,40 @@ def test_invalid_stream(engine, session):
         engine.stream(User, "latest")
 
 
+def test_update(engine, session):
+    """Blind updates render sets, removes, and increments without an object"""
+    engine.update(
+        User, key={User.id: "user_id"},
+        set={User.email: "@", User.age: increment(2), User.name: None},
+        remove=[User.joined],
+        condition=User.email.is_(None))
+    session.save_item.assert_called_once_with({
+        "ConditionExpression": "(attribute_not_exists(#n0))",
+        "ExpressionAttributeNames": {"#n0": "email", "#n2": "age", "#n5": "name", "#n7": "j"},
+        "ExpressionAttributeValues": {":v3": {"N": "2"}, ":v4": {"S": "@"}},
+        "Key": {"id": {"S": "user_id"}},
+        "TableName": "User",
+        "UpdateExpression": "SET #n0=:v4 REMOVE #n5, #n7 ADD #n2 :v3"})
+
+
+def test_update_missing_key(engine, session):
+    with pytest.raises(MissingKey):
+        engine.update(ComplexModel, key={ComplexModel.name: uuid.uuid4()}, set={ComplexModel.email: "@"})
+    session.save_item.assert_not_called()
+
+
+@pytest.mark.parametrize("updates, remove", [
+    ({User.id: "other_id"}, None),
+    (None, [User.id]),
+    ({ComplexModel.email: "@"}, None),
+])
+def test_update_invalid_columns(engine, session, updates, remove):
+    """Keys and other models' columns can't be updated"""
+    with pytest.raises(InvalidCondition):
+        engine.update(User, key={User.id: "user_id"}, set=updates, remove=remove)
+    session.save_item.assert_not_called()
+
+
 def test_bind_non_model(engine):
     """Can't bind things that don't subclass BaseModel"""
     with pytest.raises(InvalidModel):
@@ -598,6 +1074,25 @@ def test_bind_skip_abstract_models(engine, session, caplog):
     ]
 
 
+def test_bind_skip_failed_models(engine, session):
+    """A subclass whose class creation raised is still a subclass, but isn't bound"""
+    class Abstract(BaseModel):
+        class Meta:
+            abstract = True
+
+    with pytest.raises(InvalidModel):
+        class Broken(Abstract):
+            id = Column(Integer, hash_key=True)
+            other = Column(Integer, hash_key=True)
+
+    class Concrete(Abstract):
+        id = Column(Integer, hash_key=True)
+
+    session.create_table.reset_mock()
+    engine.bind(Abstract)
+    session.create_table.assert_called_once_with(Concrete)
+
+
 def test_bind_concrete_base(engine, session):
     session.create_table.reset_mock()
     session.validate_table.reset_mock()
@@ -4,7 +4,7 @@ import operator
 
 import pytest
 
-from bloop.conditions import ConditionRenderer
+from bloop.conditions import ConditionRenderer, _obj_tracking, get_marked, get_snapshot, hydrate
 from bloop.exceptions import InvalidIndex, InvalidModel, InvalidStream
 from bloop.models import (
     BaseModel,
@@ -158,6 +158,50 @@ def test_invalid_model_keys():
             both = Column(UUID, hash_key=True, range_key=True)
 
 
+def test_version_column():
+    class Versioned(BaseModel):
+        id = Column(UUID, hash_key=True)
+        version = Column(Integer, version=True)
+    assert Versioned.Meta.version_column is Versioned.version
+    assert User.Meta.version_column is None
+
+
+def test_deferred_column():
+    class Article(BaseModel):
+        id = Column(UUID, hash_key=True)
+        body = Column(String, deferred=True)
+    assert Article.Meta.deferred_columns == {Article.body}
+    assert User.Meta.deferred_columns == set()
+
+
+def test_invalid_deferred_column():
+    with pytest.raises(InvalidModel):
+        class DeferredKey(BaseModel):
+            id = Column(UUID, hash_key=True, deferred=True)
+
+    with pytest.raises(InvalidModel):
+        class DeferredVersion(BaseModel):
+            id = Column(UUID, hash_key=True)
+            version = Column(Integer, version=True, deferred=True)
+
+
+def test_invalid_version_column():
+    with pytest.raises(InvalidModel):
+        class DoubleVersion(BaseModel):
+            id = Column(UUID, hash_key=True)
+            version1 = Column(Integer, version=True)
+            version2 = Column(Integer, version=True)
+
+    with pytest.raises(InvalidModel):
+        class KeyVersion(BaseModel):
+            id = Column(Integer, hash_key=True, version=True)
+
+    with pytest.raises(InvalidModel):
+        class StringVersion(BaseModel):
+            id = Column(UUID, hash_key=True)
+            version = Column(String, version=True)
+
+
 def test_invalid_local_index():
     with pytest.raises(InvalidIndex):
         class InvalidLSI(BaseModel):
@@ -274,6 +318,47 @@ def test_meta_default_stream():
     assert Other.Meta.stream is None
 
 
+def test_meta_default_compact():
+    class Model(BaseModel):
+        id = Column(UUID, hash_key=True)
+    assert not Model.Meta.compact
+    assert hasattr(Model(), "__dict__")
+
+
+def test_compact_storage(engine):
+    """Compact models store columns in slots and track marked columns as a bitmask on the instance"""
+    class Compact(BaseModel):
+        class Meta:
+            compact = True
+        id = Column(String, hash_key=True)
+        age = Column(Integer)
+        name = Column(String)
+    engine.bind(Compact)
+
+    obj = Compact(id="foo")
+    assert not hasattr(obj, "__dict__")
+    assert obj.id == "foo"
+    assert not hasattr(obj, "age")
+    assert get_marked(obj) == {Compact.id}
+
+    obj.age = 3
+    del obj.id
+    assert not hasattr(obj, "id")
+    assert get_marked(obj) == {Compact.id, Compact.age}
+    assert obj._bloop_marked == Compact.age._bit | Compact.id._bit
+
+    loaded = hydrate(Compact(), {"id": {"S": "bar"}, "age": {"N": "4"}}, engine._codec(Compact, {
+        Compact.id, Compact.age}), engine)
+    assert (loaded.id, loaded.age) == ("bar", 4)
+    assert get_snapshot(loaded) == (
+        Compact.age.is_({"N": "4"}) &
+        Compact.id.is_({"S": "bar"})
+    )
+    # Nothing was added to the global object tracking
+    assert obj not in _obj_tracking
+    assert loaded not in _obj_tracking
+
+
 def test_abstract_not_inherited():
     class Concrete(BaseModel):
         id = Column(UUID, hash_key=True)
@@ -1,5 +1,7 @@
 import collections
 import functools
+import threading
+import time
 
 import pytest
 
@@ -14,6 +16,7 @@ from bloop.conditions import (
     NotCondition,
     OrCondition,
     comparison_aliases,
+    get_marked,
 )
 from bloop.exceptions import (
     ConstraintViolation,
@@ -29,21 +32,26 @@ from bloop.models import (
     LocalSecondaryIndex,
 )
 from bloop.search import (
+    AccessProfile,
+    HydratingQueryIterator,
     PreparedSearch,
     QueryIterator,
     ScanIterator,
     Search,
     SearchIterator,
     SearchModelIterator,
+    SegmentedCount,
+    plan_search,
     search_repr,
     validate_filter_condition,
     validate_key_condition,
     validate_search_projection,
 )
+from bloop.signals import object_loaded, objects_loaded
 from bloop.types import Integer
 from bloop.util import Sentinel
 
-from ..helpers.models import ComplexModel, User
+from ..helpers.models import ComplexModel, DeferredModel, User
 
 
 proceed = Sentinel("proceed")
@@ -395,6 +403,12 @@ def test_search_projection_all(model, index):
     assert projected == expected
 
 
+def test_search_projection_all_deferred():
+    """Deferred columns are left out of "all" but can be projected explicitly"""
+    assert validate_search_projection(DeferredModel, None, "all") == {DeferredModel.id, DeferredModel.name}
+    assert validate_search_projection(DeferredModel, None, ["body"]) == [DeferredModel.body]
+
+
 @pytest.mark.parametrize("model, index", all_permutations)
 def test_search_projection_unknown_column(model, index):
     with pytest.raises(InvalidProjection):
@@ -490,6 +504,26 @@ def test_prepare_iterator_cls(valid_search, engine, mode, cls):
     assert prepared._iterator_cls is cls
 
 
+@pytest.mark.parametrize("index, key, projection, cls", [
+    # The strict LSI doesn't include not_projected
+    (ComplexModel.by_joined, ComplexModel.name == "foo", "all", HydratingQueryIterator),
+    (ComplexModel.by_joined, ComplexModel.name == "foo", ["email"], QueryIterator),
+    (ComplexModel.by_email, ComplexModel.email == "foo", "all", QueryIterator),
+    (None, ComplexModel.name == "foo", "all", QueryIterator),
+])
+def test_prepare_hydrate(valid_search, index, key, projection, cls):
+    """Only indexes that don't include the projection are hydrated"""
+    valid_search.index = index
+    valid_search.key = key
+    valid_search.projection = projection
+    valid_search.hydrate = True
+    prepared = valid_search.prepare()
+    assert prepared._iterator_cls is cls
+    if cls is HydratingQueryIterator:
+        assert prepared._projected_columns == ComplexModel.Meta.keys
+        assert iter(prepared).consistent is True
+
+
 def test_prepare_unknown_mode(valid_search):
     valid_search.mode = "foo"
     with pytest.raises(InvalidSearchMode):
@@ -553,6 +587,128 @@ def test_prepare_valid_filter(valid_search):
     valid_search.filter = condition
     prepared = valid_search.prepare()
     assert prepared.filter is condition
+    assert prepared.promoted is None
+
+
+@pytest.mark.parametrize("filter, promoted, remaining", [
+    (ComplexModel.date >= "now", ComplexModel.date >= "now", None),
+    ((ComplexModel.date >= "now") & (ComplexModel.email == "@"),
+     ComplexModel.date >= "now", ComplexModel.email == "@"),
+    ((ComplexModel.date >= "a") & (ComplexModel.email == "@") & (ComplexModel.date <= "b"),
+     ComplexModel.date.between("a", "b"), ComplexModel.email == "@"),
+])
+def test_prepare_promotes_range_key(valid_search, filter, promoted, remaining):
+    """A range key condition in the filter moves to the key condition"""
+    valid_search.filter = filter
+    prepared = valid_search.prepare()
+    assert prepared.promoted == promoted
+    assert prepared.key == (ComplexModel.name == "foo") & promoted
+    assert prepared.filter == remaining
+    assert ("FilterExpression" in prepared._request) is (remaining is not None)
+
+
+@pytest.mark.parametrize("key, filter", [
+    # Key already has a range key condition
+    ((ComplexModel.name == "foo") & (ComplexModel.date == "x"), ComplexModel.date > "y"),
+    # Not in the top-level AND
+    (ComplexModel.name == "foo", (ComplexModel.date > "y") | (ComplexModel.email == "@")),
+    # Not a valid range key condition
+    (ComplexModel.name == "foo", ComplexModel.date != "y"),
+    (ComplexModel.name == "foo", ComplexModel.date == ComplexModel.email),
+])
+def test_prepare_range_key_not_promoted(valid_search, key, filter):
+    valid_search.key = key
+    valid_search.filter = filter
+    with pytest.raises(InvalidFilterCondition):
+        valid_search.prepare()
+
+
+def test_plan_table_query():
+    condition = (ComplexModel.name == "n") & (ComplexModel.date >= "d") & (ComplexModel.email == "e")
+    plan = plan_search(ComplexModel, condition)
+    assert (plan.mode, plan.index) == ("query", None)
+    assert plan.key == (ComplexModel.name == "n") & (ComplexModel.date >= "d")
+    assert plan.filter == (ComplexModel.email == "e")
+    assert plan.reason == "hash and range key condition on ComplexModel"
+
+
+def test_plan_index_query():
+    """An index is queried with an explicit projection of every column"""
+    plan = plan_search(ComplexModel, (ComplexModel.email == "e") & (ComplexModel.joined == "j"))
+    assert (plan.mode, plan.index) == ("query", ComplexModel.by_email)
+    assert plan.key == (ComplexModel.email == "e")
+    assert plan.filter == (ComplexModel.joined == "j")
+    assert set(plan.projection) == ComplexModel.Meta.columns
+
+
+@pytest.mark.parametrize("projection, index", [
+    # The strict LSI only includes email
+    ("all", None),
+    (["email"], ComplexModel.by_joined),
+])
+def test_plan_prefers_range_key(projection, index):
+    """A range key condition is preferred when the projection is covered"""
+    condition = (ComplexModel.name == "n") & (ComplexModel.joined > "j")
+    plan = plan_search(ComplexModel, condition, projection=projection)
+    assert plan.index is index
+
+
+@pytest.mark.parametrize("condition, consistent", [
+    (None, False),
+    (ComplexModel.email.contains("@"), False),
+    (ComplexModel.name.begins_with("n"), False),
+    # GSIs don't support consistent reads
+    (ComplexModel.email == "e", True),
+])
+def test_plan_scan(condition, consistent):
+    plan = plan_search(ComplexModel, condition, consistent=consistent)
+    assert (plan.mode, plan.index, plan.key) == ("scan", None, None)
+    assert plan.filter == condition
+    assert plan.explain().startswith("Scan ComplexModel\n")
+
+
+def test_access_profile():
+    """A profile projects the keys and the columns it's seen read"""
+    profile = AccessProfile(mode="query", model=ComplexModel, index=ComplexModel.by_joined, site="app.py:12")
+    assert profile.suggest() == ["date", "joined", "name"]
+
+    # Columns the index doesn't include are never projected
+    profile.read.update([ComplexModel.email, ComplexModel.not_projected])
+    assert profile.projection() == [ComplexModel.date, ComplexModel.email, ComplexModel.joined, ComplexModel.name]
+    assert repr(profile) == "<AccessProfile[query ComplexModel.by_joined at app.py:12: date, email, joined, name]>"
+
+
+def test_prepare_auto_projection(valid_search, session):
+    """The first search from a profile is lazy over every column, and later searches are narrowed"""
+    profile = AccessProfile(mode="query", model=ComplexModel, index=None, site="app.py:12")
+    valid_search.projection = "auto"
+    valid_search.profile = profile
+
+    profiled = valid_search.prepare()
+    assert profiled.lazy
+    assert profiled._projected_columns == ComplexModel.Meta.columns
+    assert iter(profiled).profile is profile
+
+    profile.read.add(ComplexModel.email)
+    narrowed = valid_search.prepare()
+    assert not narrowed.lazy
+    assert narrowed._projected_columns == [ComplexModel.date, ComplexModel.email, ComplexModel.name]
+    assert profile.executions == 2
+
+    # Reading a column outside the narrowed projection loads it from the table
+    key = {"name": {"S": "2b1ba83a-6ea1-4b45-a17d-8bb2a1d2d3a4"}, "date": {"S": "now"}}
+    session.search_items.return_value = {"Count": 1, "ScannedCount": 1, "Items": [dict(key, email={"S": "e"})]}
+    session.load_items.return_value = {"CustomTableName": [dict(key, joined={"S": "j"})]}
+    obj = iter(narrowed).one()
+    assert obj.email == "e"
+    assert not session.load_items.called
+    assert obj.joined == "j"
+    assert session.load_items.call_count == 1
+    assert ComplexModel.joined in profile.read
+
+    valid_search.profile = None
+    with pytest.raises(InvalidProjection):
+        valid_search.prepare()
 
 
 def test_prepare_invalid_filter(valid_search):
@@ -567,9 +723,12 @@ def test_prepare_invalid_filter(valid_search):
 def test_prepare_constraints(valid_search):
     valid_search.forward = False
     valid_search.parallel = (1, 5)
+    valid_search.limit = 3
     prepared = valid_search.prepare()
     assert prepared.forward is False
     assert prepared.parallel == (1, 5)
+    assert prepared.limit == 3
+    assert iter(prepared).limit == 3
 
 
 @pytest.mark.parametrize("mode, cls", [("query", QueryIterator), ("scan", ScanIterator)])
@@ -580,6 +739,15 @@ def test_prepare_iter(valid_search, mode, cls):
     assert isinstance(it, cls)
 
 
+def test_prepare_iter_copies_request(valid_search):
+    """Iterators from the same prepared search don't share continuation tokens"""
+    prepared = valid_search.prepare()
+    first, second = iter(prepared), iter(prepared)
+    first.request["ExclusiveStartKey"] = proceed
+    assert "ExclusiveStartKey" not in second.request
+    assert "ExclusiveStartKey" not in prepared._request
+
+
 @pytest.mark.parametrize("mode, include", [("scan", False), ("query", True)])
 def test_prepare_request_forward(valid_search, mode, include):
     valid_search.mode = mode
@@ -623,10 +791,10 @@ def test_prepare_request_parallel(valid_search, mode, parallel):
     valid_search.parallel = parallel
     prepared = valid_search.prepare()
     if parallel and (mode == "scan"):
-        actual = prepared._request["Segments"], prepared._request["TotalSegments"]
+        actual = prepared._request["Segment"], prepared._request["TotalSegments"]
         assert actual == parallel
     else:
-        assert "Segments" not in prepared._request
+        assert "Segment" not in prepared._request
         assert "TotalSegments" not in prepared._request
 
 
@@ -805,6 +973,104 @@ def test_one_failure(simple_iter, session, chain):
     assert iterator.scanned == 3 * sum(chain)
 
 
+def test_limit_stops_early(simple_iter, session):
+    """The request Limit is the number of remaining results, and no calls are made once it's reached"""
+    iterator = simple_iter()
+    iterator.limit = 3
+    limits = []
+
+    def respond(mode, request):
+        limits.append(request["Limit"])
+        return responses.pop(0)
+    responses = build_responses([2, 1, 4], items=list(range(7)))
+    session.search_items.side_effect = respond
+
+    assert list(iterator) == [0, 1, 2]
+    assert limits == [3, 1]
+    assert iterator.exhausted
+    assert iterator.count == 3
+
+
+def test_limit_with_filter(simple_iter, session):
+    """Limit is applied before a filter, so the remaining count isn't sent for filtered searches"""
+    iterator = simple_iter()
+    iterator.limit = 3
+    iterator.request["FilterExpression"] = "(#n0 = :v1)"
+
+    def respond(mode, request):
+        assert "Limit" not in request
+        return responses.pop(0)
+    responses = build_responses([2, 1, 4], items=list(range(7)))
+    session.search_items.side_effect = respond
+
+    assert list(iterator) == [0, 1, 2]
+    assert iterator.count == 3
+
+
+def test_limit_with_filter_overshoot(simple_iter, session):
+    """A filtered page with more matches than the remaining limit is trimmed"""
+    iterator = simple_iter()
+    iterator.limit = 3
+    iterator.request["FilterExpression"] = "(#n0 = :v1)"
+    session.search_items.side_effect = build_responses([2, 4, 1], items=list(range(7)))
+
+    assert list(iterator) == [0, 1, 2]
+    assert iterator.count == 3
+    # Everything DynamoDB read still counts as scanned
+    assert iterator.scanned == 18
+    assert session.search_items.call_count == 2
+
+
+def test_no_limit(simple_iter, session):
+    """Limit isn't sent when the iterator has no limit"""
+    iterator = simple_iter()
+    iterator.request["Limit"] = 10
+
+    def respond(mode, request):
+        assert "Limit" not in request
+        return responses.pop(0)
+    responses = build_responses([2, 1], items=list(range(3)))
+    session.search_items.side_effect = respond
+
+    assert list(iterator) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("method, page_limit", [("first", 1), ("one", 2)])
+def test_first_one_page_limit(simple_iter, session, method, page_limit):
+    """first() and one() only request as many items as they need"""
+    iterator = simple_iter()
+    session.search_items.return_value = response(terminate=True)
+
+    getattr(iterator, method)()
+    request = session.search_items.call_args[0][1]
+    assert request["Limit"] == page_limit
+    # The hint doesn't apply to later iteration
+    assert iterator._page_limit is None
+
+
+@pytest.mark.parametrize("method", ["first", "one"])
+def test_first_one_page_limit_with_filter(simple_iter, session, method):
+    """Limit is applied before a filter, so first() and one() don't shrink filtered pages"""
+    iterator = simple_iter()
+    iterator.request["FilterExpression"] = "(#n0 = :v1)"
+    session.search_items.return_value = response(terminate=True)
+
+    getattr(iterator, method)()
+    request = session.search_items.call_args[0][1]
+    assert "Limit" not in request
+
+
+def test_first_page_limit_capped_by_limit(simple_iter, session):
+    """The smaller of the remaining limit and the first() hint is used"""
+    iterator = simple_iter()
+    iterator.limit = 5
+    session.search_items.return_value = response(terminate=True)
+
+    iterator.one()
+    request = session.search_items.call_args[0][1]
+    assert request["Limit"] == 2
+
+
 @pytest.mark.parametrize("cls", [ScanIterator, QueryIterator])
 def test_model_iterator_unpacks(simple_iter, session, cls):
     iterator = simple_iter(cls=cls)
@@ -821,4 +1087,164 @@ def test_model_iterator_unpacks(simple_iter, session, cls):
         assert not hasattr(obj, attr)
 
 
+@pytest.mark.parametrize("object_loaded_signals", [True, False])
+def test_model_iterator_page_signals(simple_iter, session, engine, object_loaded_signals):
+    """Each page is loaded at once and sent as one objects_loaded"""
+    engine.object_loaded_signals = object_loaded_signals
+    iterator = simple_iter(cls=ScanIterator)
+    iterator.projected = {User.name}
+    session.search_items.side_effect = [
+        {"Count": 2, "ScannedCount": 2, "Items": [{"name": {"S": "a"}}, {"name": {"S": "b"}}],
+         "LastEvaluatedKey": proceed},
+        {"Count": 1, "ScannedCount": 1, "Items": [{"name": {"S": "c"}}]},
+    ]
+
+    single, batches = [], []
+    with object_loaded.connected_to(lambda _, obj, **__: single.append(obj)), \
+            objects_loaded.connected_to(lambda _, objs, **__: batches.append(objs)):
+        results = list(iterator)
+
+    assert [obj.name for obj in results] == ["a", "b", "c"]
+    assert batches == [results[:2], results[2:]]
+    assert single == (results if object_loaded_signals else [])
+
+
+def test_model_iterator_lazy(simple_iter, session):
+    iterator = simple_iter(cls=ScanIterator)
+    iterator.lazy = True
+    iterator.projected = {User.name, User.joined}
+
+    attrs = {"name": {"S": "numberoverzero"}}
+    session.search_items.return_value = response(terminate=True, count=1, item=attrs)
+
+    obj = iterator.first()
+
+    assert get_marked(obj) == {User.name, User.joined}
+    assert obj.name == "numberoverzero"
+    assert obj.joined is None
+    for attr in ["id", "age", "email"]:
+        assert not hasattr(obj, attr)
+
+
+def test_hydrating_iterator(simple_iter, session):
+    """Keys from each page are loaded from the table in index order, skipping deleted items"""
+    iterator = simple_iter(cls=HydratingQueryIterator, index=User.by_email)
+    iterator.projected = {User.id}
+    iterator.consistent = True
+    session.search_items.side_effect = [
+        {"Count": 2, "ScannedCount": 2, "Items": [{"id": {"S": "a"}}, {"id": {"S": "b"}}],
+         "LastEvaluatedKey": proceed},
+        {"Count": 0, "ScannedCount": 4, "Items": [], "LastEvaluatedKey": proceed},
+        {"Count": 1, "ScannedCount": 1, "Items": [{"id": {"S": "c"}}]},
+    ]
+
+    def load_items(request):
+        assert request["User"]["ConsistentRead"] is True
+        # "b" was deleted after the index was read
+        return {"User": [dict(key, age={"N": "3"}) for key in request["User"]["Keys"] if key["id"]["S"] != "b"]}
+    session.load_items.side_effect = load_items
+
+    results = list(iterator)
+    assert [(obj.id, obj.age) for obj in results] == [("a", 3), ("c", 3)]
+    assert iterator.exhausted
+    assert session.search_items.call_count == 3
+    assert session.load_items.call_count == 2
+
+
 # END ITERATOR TESTS =============================================================================== END ITERATOR TESTS
+
+
+# COUNT TESTS ============================================================================================= COUNT TESTS
+
+
+@pytest.fixture
+def count_search(engine):
+    return Search(mode="scan", engine=engine, model=User, index=None, projection="count").prepare()
+
+
+def test_segmented_count(count_search, session):
+    """Each segment follows its own continuation tokens, and totals are reported per segment"""
+    def respond(mode, request):
+        assert mode == "scan"
+        assert request["Select"] == "COUNT"
+        assert request["TotalSegments"] == 4
+        segment = request["Segment"]
+        if request.get("ExclusiveStartKey") is None:
+            return {"Count": segment, "ScannedCount": 2 * segment, "LastEvaluatedKey": proceed}
+        return {"Count": 1, "ScannedCount": 1}
+    session.search_items.side_effect = respond
+
+    progress = []
+    count = SegmentedCount(prepared=count_search, segments=4)
+    assert count.progress == 0.0
+    assert count.run(callback=lambda c: progress.append((c.pages, c.progress))) is count
+
+    assert count.count == 10
+    assert count.scanned == 16
+    assert count.segments == [
+        {"count": 1, "scanned": 1, "pages": 2, "exhausted": True},
+        {"count": 2, "scanned": 3, "pages": 2, "exhausted": True},
+        {"count": 3, "scanned": 5, "pages": 2, "exhausted": True},
+        {"count": 4, "scanned": 7, "pages": 2, "exhausted": True},
+    ]
+    assert session.search_items.call_count == 8
+    assert count.pages == 8
+    # The callback sees every page, not just every finished segment
+    assert [pages for pages, _ in progress] == list(range(1, 9))
+    assert progress == sorted(progress)
+    assert progress[-1] == (8, 1.0)
+    assert not count.approximate
+
+
+def test_segmented_count_single_segment(count_search, session):
+    """A single segment doesn't send Segment or TotalSegments"""
+    session.search_items.return_value = {"Count": 3, "ScannedCount": 5}
+    count = SegmentedCount(prepared=count_search, segments=1).run()
+
+    request = session.search_items.call_args[0][1]
+    assert "Segment" not in request
+    assert "TotalSegments" not in request
+    assert count.count == 3
+    assert count.scanned == 5
+
+
+def test_segmented_count_workers(count_search, session):
+    """No more than ``workers`` segments are scanned at once"""
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def respond(mode, request):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return {"Count": 1, "ScannedCount": 1}
+    session.search_items.side_effect = respond
+
+    count = SegmentedCount(prepared=count_search, segments=6, workers=2).run()
+    assert count.count == 6
+    assert count.pages == 6
+    assert peak[0] <= 2
+
+
+def test_segmented_count_raises(count_search, session):
+    """An exception in any segment is raised from run"""
+    session.search_items.side_effect = ConstraintViolation("failed")
+    with pytest.raises(ConstraintViolation):
+        SegmentedCount(prepared=count_search, segments=3).run()
+
+
+def test_segmented_count_approximate(count_search, session):
+    count = SegmentedCount(prepared=count_search, segments=3, item_count=7).run()
+    assert count.approximate
+    assert count.count == count.scanned == 7
+    assert count.segments == []
+    assert count.pages == 0
+    assert count.progress == 1.0
+    session.search_items.assert_not_called()
+    assert repr(count) == "<SegmentedCount[User]>"
+
+
+# END COUNT TESTS ===================================================================================== END COUNT TESTS
@@ -87,10 +87,17 @@ def client_error(code):
 
 def test_save_item(session, dynamodb):
     request = {"foo": "bar"}
-    session.save_item(request)
+    dynamodb.update_item.return_value = {}
+    assert session.save_item(request) == {}
     dynamodb.update_item.assert_called_once_with(**request)
 
 
+def test_save_item_return_values(session, dynamodb):
+    request = {"foo": "bar", "ReturnValues": "UPDATED_NEW"}
+    dynamodb.update_item.return_value = {"Attributes": {"age": {"N": "3"}}}
+    assert session.save_item(request) == {"age": {"N": "3"}}
+
+
 def test_save_item_unknown_error(session, dynamodb):
     request = {"foo": "bar"}
     cause = dynamodb.update_item.side_effect = client_error("FooError")
@@ -116,12 +123,35 @@ def test_save_item_condition_failed(session, dynamodb):
 # DELETE ITEM ============================================================================================= DELETE ITEM
 
 
+def test_put_item(session, dynamodb):
+    request = {"foo": "bar"}
+    dynamodb.put_item.return_value = {"Attributes": {"age": {"N": "3"}}}
+    assert session.put_item(request) == {"age": {"N": "3"}}
+    dynamodb.put_item.assert_called_once_with(**request)
+
+
+def test_put_item_condition_failed(session, dynamodb):
+    request = {"foo": "bar"}
+    dynamodb.put_item.side_effect = client_error("ConditionalCheckFailedException")
+
+    with pytest.raises(ConstraintViolation):
+        session.put_item(request)
+    dynamodb.put_item.assert_called_once_with(**request)
+
+
 def test_delete_item(session, dynamodb):
     request = {"foo": "bar"}
-    session.delete_item(request)
+    dynamodb.delete_item.return_value = {}
+    assert session.delete_item(request) == {}
     dynamodb.delete_item.assert_called_once_with(**request)
 
 
+def test_delete_item_return_values(session, dynamodb):
+    request = {"foo": "bar", "ReturnValues": "ALL_OLD"}
+    dynamodb.delete_item.return_value = {"Attributes": {"age": {"N": "3"}}}
+    assert session.delete_item(request) == {"age": {"N": "3"}}
+
+
 def test_delete_item_unknown_error(session, dynamodb):
     request = {"foo": "bar"}
     cause = dynamodb.delete_item.side_effect = client_error("FooError")
@@ -183,6 +213,24 @@ def test_batch_get_one_item(session, dynamodb):
     dynamodb.batch_get_item.assert_called_once_with(RequestItems=expected_request)
 
 
+def test_batch_get_projection(session, dynamodb):
+    """Each chunk keeps the table's projection"""
+    request = {"User": {
+        "Keys": [{"id": {"S": str(i)}} for i in range(BATCH_GET_ITEM_CHUNK_SIZE + 1)],
+        "ConsistentRead": True,
+        "ProjectionExpression": "#n0",
+        "ExpressionAttributeNames": {"#n0": "id"}}}
+    dynamodb.batch_get_item.return_value = {"Responses": {}, "UnprocessedKeys": {}}
+
+    session.load_items(request)
+    assert dynamodb.batch_get_item.call_count == 2
+    for call in dynamodb.batch_get_item.call_args_list:
+        chunk = call[1]["RequestItems"]["User"]
+        assert chunk["ConsistentRead"] is True
+        assert chunk["ProjectionExpression"] == "#n0"
+        assert chunk["ExpressionAttributeNames"] == {"#n0": "id"}
+
+
 def test_batch_get_one_batch(session, dynamodb):
     """A single call when the number of requested items is <= batch size"""
     users = [User(id=str(i)) for i in range(BATCH_GET_ITEM_CHUNK_SIZE)]
@@ -443,6 +491,19 @@ def test_create_already_exists(session, dynamodb):
 # VALIDATE TABLE ====================================================================================== VALIDATE TABLE
 
 
+def test_describe_table(session, dynamodb):
+    dynamodb.describe_table.return_value = {"Table": {"TableName": "User", "ItemCount": 3}}
+    assert session.describe_table("User") == {"TableName": "User", "ItemCount": 3}
+    dynamodb.describe_table.assert_called_once_with(TableName="User")
+
+
+def test_describe_table_raises(session, dynamodb):
+    cause = dynamodb.describe_table.side_effect = client_error("FooError")
+    with pytest.raises(BloopException) as excinfo:
+        session.describe_table("User")
+    assert excinfo.value.__cause__ is cause
+
+
 def test_validate_compares_tables(session, dynamodb):
     description = expected_table_description(User)
     description["TableStatus"] = "ACTIVE"
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from bloop.models import BaseModel, Column
+from bloop.signals import object_loaded, objects_loaded
 from bloop.stream.coordinator import Coordinator
 from bloop.stream.stream import Stream
 from bloop.types import Integer, String
@@ -121,3 +122,22 @@ def test_next_unpacks(stream, coordinator):
 
     assert record["key"] is None
     assert not hasattr(record["key"], "data")
+
+
+@pytest.mark.parametrize("object_loaded_signals", [True, False])
+def test_next_signals(stream, coordinator, engine, object_loaded_signals):
+    """objects_loaded is sent once per record; object_loaded only when the engine sends it for each object"""
+    engine.object_loaded_signals = object_loaded_signals
+    coordinator.__next__.return_value = {
+        "old": {"id": {"N": "0"}, "data": {"S": "some-data"}},
+        "key": None,
+        "new": {"id": {"N": "0"}, "data": {"S": "other-data"}},
+        "meta": {}
+    }
+    single, batches = [], []
+    with object_loaded.connected_to(lambda _, obj, **__: single.append(obj)), \
+            objects_loaded.connected_to(lambda _, objs, **__: batches.append(objs)):
+        record = next(stream)
+
+    assert batches == [[record["new"], record["old"]]]
+    assert single == ([record["new"], record["old"]] if object_loaded_signals else [])